@@ -0,0 +1,369 @@
+"""Local stand-ins for the upstream APIs used by the agent pipeline.
+
+Each fake runs a threaded HTTP server on 127.0.0.1 with configurable
+latency, error rate and rate limiting, and counts every request it serves.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken missing or its data cannot be downloaded
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class Faults:
+    """Failure injection for a fake server."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_every: int = 0
+    retry_after: float = 0.0
+
+
+class FakeServer:
+    """Base class: subclasses implement ``handle(method, path, query, body)``."""
+
+    name = "fake"
+
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0):
+        self.faults = faults or Faults()
+        self.calls: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def start(self) -> "FakeServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _dispatch(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                status, headers, payload = fake._serve(method, self.path, raw)
+                content_type = headers.pop("Content-Type", "application/json")
+                if content_type == "text/event-stream":
+                    # payload is a list of server-sent events
+                    body = "".join(f"data: {json.dumps(event)}\n\n" for event in payload)
+                    body = (body + "data: [DONE]\n\n").encode("utf-8")
+                else:
+                    body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=f"{self.name}-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls.clear()
+
+    def _serve(self, method: str, raw_path: str, raw_body: bytes) -> Tuple[int, Dict[str, str], Any]:
+        parsed = urlparse(raw_path)
+        route = re.sub(r"/[A-Za-z0-9]{20,}", "/{id}", parsed.path)
+        with self._lock:
+            self.calls[f"{method} {route}"] += 1
+            self._requests += 1
+            count = self._requests
+            fail = self._random.random() < self.faults.error_rate
+            delay = self.faults.latency + self._random.uniform(0, self.faults.jitter)
+
+        if delay:
+            time.sleep(delay)
+        if self.faults.rate_limit_every and count % self.faults.rate_limit_every == 0:
+            reset = int(time.time() + self.faults.retry_after)
+            return 429, {
+                "Retry-After": str(self.faults.retry_after),
+                "x-rate-limit-remaining": "0",
+                "x-rate-limit-reset": str(reset),
+            }, {"error": "rate limited"}
+        if fail:
+            return 500, {}, {"error": "injected failure"}
+
+        body = json.loads(raw_body) if raw_body else {}
+        return self.handle(method, parsed.path, parse_qs(parsed.query), body)
+
+    def handle(self, method: str, path: str, query: Dict[str, Any], body: Any) -> Tuple[int, Dict[str, str], Any]:
+        raise NotImplementedError
+
+
+class FakeSolanaTracker(FakeServer):
+    """``GET /tokens/{address}`` with a deterministic payload per address."""
+
+    name = "solana-tracker"
+
+    def handle(self, method, path, query, body):
+        match = re.fullmatch(r"/tokens/([^/]+)", path)
+        if method != "GET" or not match:
+            return 404, {}, {"error": "not found"}
+        return 200, {}, token_payload(match.group(1))
+
+
+def token_payload(address: str, pools: int = 5, risks: int = 6) -> Dict[str, Any]:
+    rng = random.Random(address)
+    price = rng.uniform(0.0001, 2.0)
+    supply = rng.uniform(1e6, 1e9)
+    return {
+        "token": {
+            "name": f"Token {address[:4]}",
+            "symbol": address[:4].upper(),
+            "mint": address,
+            "decimals": 6,
+            "description": "A benchmark token. " * 10,
+            "image": f"https://example.com/{address}.png",
+            "twitter": f"https://x.com/{address[:6]}",
+            "website": f"https://{address[:6].lower()}.example.com",
+            "createdOn": "https://pump.fun",
+        },
+        "pools": [
+            {
+                "poolId": f"{address[:8]}pool{i}",
+                "liquidity": {"quote": rng.uniform(10, 1e4), "usd": rng.uniform(1e3, 5e6)},
+                "price": {"quote": price / 150, "usd": price},
+                "tokenSupply": supply,
+                "lpBurn": rng.randint(0, 100),
+                "marketCap": {"quote": price * supply / 150, "usd": price * supply},
+                "market": "raydium",
+                "quoteToken": "So11111111111111111111111111111111111111112",
+                "security": {"freezeAuthority": None, "mintAuthority": None if rng.random() < 0.8 else "auth"},
+                "txns": {"buys": rng.randint(0, 5000), "sells": rng.randint(0, 5000), "volume": rng.uniform(0, 1e6)},
+                "lastUpdated": int(time.time() * 1000),
+            }
+            for i in range(pools)
+        ],
+        "events": {
+            window: {"priceChangePercentage": rng.uniform(-30, 30)}
+            for window in ("1m", "5m", "15m", "30m", "1h", "2h", "3h", "4h", "5h", "6h", "12h", "24h")
+        },
+        "risk": {
+            "rugged": rng.random() < 0.05,
+            "risks": [
+                {"name": f"Risk {i}", "description": "Benchmark risk description.", "level": "warning", "score": 100}
+                for i in range(risks)
+            ],
+            "score": rng.randint(0, 10),
+        },
+        "buys": rng.randint(0, 20000),
+        "sells": rng.randint(0, 20000),
+        "txns": rng.randint(0, 40000),
+        "holders": rng.randint(10, 100000),
+    }
+
+
+class FakeTavily(FakeServer):
+    """``POST /search`` returning canned results."""
+
+    name = "tavily"
+
+    def handle(self, method, path, query, body):
+        if method != "POST" or path != "/search":
+            return 404, {}, {"error": "not found"}
+        text = body.get("query", "")
+        limit = body.get("max_results") or 5
+        return 200, {}, {
+            "query": text,
+            "answer": None,
+            "results": [
+                {
+                    "title": f"Result {i} for {text}",
+                    "url": f"https://news.example.com/{hashlib.sha1(repr((text, i)).encode('utf-8')).hexdigest()[:16]}",
+                    "content": f"Benchmark search snippet {i} about {text}. " * 8,
+                    "score": 1.0 - i / 10,
+                }
+                for i in range(limit)
+            ],
+            "response_time": 0.01,
+        }
+
+
+class FakeTwitter(FakeServer):
+    """The Twitter v2 endpoints used by TwitterTools and the outbox."""
+
+    name = "twitter"
+
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0):
+        super().__init__(faults, seed)
+        self.tweets = []
+
+    def handle(self, method, path, query, body):
+        limits = {"x-rate-limit-remaining": "100", "x-rate-limit-reset": str(int(time.time()) + 900)}
+        if method == "POST" and path == "/2/tweets":
+            with self._lock:
+                self.tweets.append(body.get("text", ""))
+                tweet_id = str(10 ** 18 + len(self.tweets))
+            return 201, limits, {"data": {"id": tweet_id, "text": body.get("text", ""), "edit_history_tweet_ids": [tweet_id]}}
+        if method == "GET" and path == "/2/users/me":
+            return 200, limits, {"data": {"id": "42", "name": "Bench", "username": "bench"}}
+        if method == "GET" and re.fullmatch(r"/2/users/[^/]+/tweets", path):
+            data = [{"id": str(10 ** 18 + i + 1), "text": t, "edit_history_tweet_ids": []} for i, t in enumerate(self.tweets[-20:])]
+            return 200, limits, {"data": data, "meta": {"result_count": len(data)}}
+        if method == "GET" and path == "/2/tweets/search/recent":
+            page = int((query.get("next_token") or ["0"])[0])
+            size = int((query.get("max_results") or ["10"])[0])
+            data = [
+                {
+                    "id": str(2 * 10 ** 18 - page * size - i),
+                    "text": f"Tweet {page}-{i} about {query.get('query', [''])[0]}",
+                    "author_id": str(i % 5),
+                    "created_at": "2024-01-01T00:00:00.000Z",
+                    "public_metrics": {"like_count": i, "retweet_count": 0, "reply_count": 0, "quote_count": 0},
+                    "edit_history_tweet_ids": [],
+                }
+                for i in range(size)
+            ]
+            users = [{"id": str(i), "name": f"User {i}", "username": f"user{i}"} for i in range(5)]
+            meta = {"result_count": size}
+            if page < 2:
+                meta["next_token"] = str(page + 1)
+            return 200, limits, {"data": data, "includes": {"users": users}, "meta": meta}
+        return 404, {}, {"title": "Not Found"}
+
+
+class FakeOpenAI(FakeServer):
+    """
+    OpenAI-compatible ``/chat/completions`` speaking crewai's ReAct format.
+
+    Agents that have a GetTokenInfo tool and no embedded token data first get
+    an Action for the tool, then a Final Answer; everyone else answers
+    directly. Prompt and completion token totals are recorded.
+    """
+
+    name = "openai"
+
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0, answer_words: int = 120):
+        super().__init__(faults, seed)
+        self.answer_words = answer_words
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def reset_counts(self):
+        super().reset_counts()
+        with self._lock:
+            self.prompt_tokens = self.completion_tokens = 0
+
+    def handle(self, method, path, query, body):
+        if method != "POST" or not path.endswith("/chat/completions"):
+            return 404, {}, {"error": "not found"}
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        content = self._reply(prompt)
+
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        if body.get("stream"):
+            return 200, {"Content-Type": "text/event-stream"}, self._chunks(body, content, usage)
+        return 200, {}, {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    @staticmethod
+    def _chunks(body, content: str, usage: Dict[str, int]) -> List[Dict[str, Any]]:
+        base = {"id": "chatcmpl-bench", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": body.get("model", "gpt-4")}
+        pieces = re.findall(r"\S+\s*|\s+", content)
+        chunks = [
+            {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            for piece in pieces
+        ]
+        chunks.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunks.append({**base, "choices": [], "usage": usage})
+        return chunks
+
+    def _reply(self, prompt: str) -> str:
+        if "tweet" in prompt.lower() and ("Professional Content Writer" in prompt or "Content Quality Manager" in prompt):
+            return "Thought: I now can give a great answer\nFinal Answer: Benchmark token trades at $0.42 with $1.2M liquidity and a low risk score. Momentum is up 4% over 24h."
+        address = re.search(r"for ([1-9A-HJ-NP-Za-km-z]{20,})", prompt)
+        # The ReAct instructions mention "Observation:" once; more means a tool already ran.
+        if ("Tool Name: GetTokenInfo" in prompt and prompt.count("Observation:") <= 1
+                and "Token data (already fetched" not in prompt and address):
+            return (
+                "Thought: I need the token data first\nAction: GetTokenInfo\n"
+                f'Action Input: {{"token_address": "{address.group(1)}"}}'
+            )
+        # Varied filler: litellm rejects streams that repeat the same chunk.
+        words = " ".join(f"analysis{i % 10}" for i in range(self.answer_words))
+        return f"Thought: I now can give a great answer\nFinal Answer: The token shows stable metrics. {words}"
+
+
+class RedirectAdapter(HTTPAdapter):
+    """requests adapter that sends calls for a real host to a fake server."""
+
+    def __init__(self, target: str, **kwargs):
+        super().__init__(**kwargs)
+        self.target = target.rstrip("/")
+
+    def send(self, request, **kwargs):
+        parsed = urlparse(request.url)
+        request.url = self.target + parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        return super().send(request, **kwargs)
+
+
+def redirect_session(session: requests.Session, host: str, target: str):
+    """Route every request ``session`` makes to ``host`` to ``target`` instead."""
+    session.mount(host, RedirectAdapter(target))
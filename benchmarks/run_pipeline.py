@@ -0,0 +1,219 @@
+"""End-to-end benchmark of the agent pipeline against local fake servers.
+
+Usage:
+    python benchmarks/run_pipeline.py [--iterations 5] [--batch-size 8]
+        [--llm-latency 0.05] [--api-latency 0.02] [--error-rate 0] [--json] [--metrics]
+
+No network access or API keys are needed: Solana Tracker, Tavily, Twitter
+and the OpenAI chat endpoint are all served locally by fake_servers.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fake_servers import (  # noqa: E402
+    Faults,
+    FakeOpenAI,
+    FakeSolanaTracker,
+    FakeTavily,
+    FakeTwitter,
+    redirect_session,
+)
+
+BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def make_addresses(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(BASE58) for _ in range(44)) for _ in range(count)]
+
+
+class Recorder:
+    def __init__(self, fakes):
+        self.fakes = fakes
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.upstream: Dict[str, Dict[str, int]] = {}
+        self.tokens: Dict[str, Dict[str, int]] = {}
+
+    @contextlib.contextmanager
+    def scenario(self, name: str):
+        for fake in self.fakes.values():
+            fake.reset_counts()
+        yield
+        self.upstream[name] = {
+            f"{fake.name} {route}": count
+            for fake in self.fakes.values()
+            for route, count in sorted(fake.calls.items())
+        }
+        openai = self.fakes["openai"]
+        self.tokens[name] = {"prompt": openai.prompt_tokens, "completion": openai.completion_tokens}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - started)
+
+    def report(self) -> Dict[str, Dict]:
+        return {
+            "latency_ms": {
+                name: {
+                    "n": len(values),
+                    "p50": round(percentile(values, 50) * 1000, 1),
+                    "p99": round(percentile(values, 99) * 1000, 1),
+                    "mean": round(statistics.fmean(values) * 1000, 1),
+                }
+                for name, values in self.samples.items()
+            },
+            "upstream_calls": self.upstream,
+            "llm_tokens": self.tokens,
+        }
+
+
+def print_report(report: Dict[str, Dict]):
+    print(f"\n{'stage':<28}{'n':>5}{'p50 ms':>12}{'p99 ms':>12}{'mean ms':>12}")
+    for name, row in report["latency_ms"].items():
+        print(f"{name:<28}{row['n']:>5}{row['p50']:>12}{row['p99']:>12}{row['mean']:>12}")
+    print("\nUpstream calls per scenario")
+    for scenario, calls in report["upstream_calls"].items():
+        total = sum(calls.values())
+        print(f"  {scenario} (total {total})")
+        for route, count in calls.items():
+            print(f"    {route:<45}{count:>6}")
+    print("\nLLM tokens per scenario")
+    for scenario, tokens in report["llm_tokens"].items():
+        print(f"  {scenario:<26} prompt={tokens['prompt']:<9} completion={tokens['completion']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake chat completion")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="Seconds per fake data API call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of data API calls failing with 500")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth data API call with 429")
+    parser.add_argument("--scenarios", default="fetch,analyze,analyze_parallel,tweet,batch")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show crew output")
+    parser.add_argument("--metrics", action="store_true", help="Also print the Prometheus metrics snapshot")
+    args = parser.parse_args(argv)
+
+    api_faults = Faults(latency=args.api_latency, error_rate=args.error_rate, rate_limit_every=args.rate_limit_every)
+    fakes = {
+        "solana": FakeSolanaTracker(api_faults).start(),
+        "tavily": FakeTavily(Faults(latency=args.api_latency)).start(),
+        "twitter": FakeTwitter(Faults(latency=args.api_latency)).start(),
+        "openai": FakeOpenAI(Faults(latency=args.llm_latency)).start(),
+    }
+    os.environ.update({
+        "SOLANA_TRACKER_BASE_URL": fakes["solana"].url,
+        "SOLANA_TRACKER_API_KEY": "bench",
+        "OPENAI_API_BASE": fakes["openai"].url + "/v1",
+        "OPENAI_BASE_URL": fakes["openai"].url + "/v1",
+        "OPENAI_API_KEY": "sk-bench",
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+        "OTEL_SDK_DISABLED": "true",
+        "CREWAI_TELEMETRY_OPT_OUT": "true",
+    })
+
+    # Imported after the environment points at the fakes.
+    import tweepy
+    from tavily import TavilyClient
+    from studia_agent.instrumentation import metrics
+    from studia_agent.main import analyze_and_tweet_token
+    from studia_agent.researcher import TokenAnalyzer
+    from studia_agent.services.token_service import TokenService
+
+    tavily_client = TavilyClient(api_key="bench")
+    tavily_client.base_url = fakes["tavily"].url
+    twitter_client = tweepy.Client(
+        consumer_key="bench", consumer_secret="bench",
+        access_token="bench", access_token_secret="bench",
+        bearer_token="bench",
+    )
+    redirect_session(twitter_client.session, "https://api.twitter.com", fakes["twitter"].url)
+
+    token_service = TokenService()
+    analyzer = TokenAnalyzer(token_service)
+    recorder = Recorder(fakes)
+    scenarios = set(args.scenarios.split(","))
+    addresses = iter(make_addresses(args.iterations * (5 + args.batch_size), seed=7))
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        if "fetch" in scenarios:
+            with recorder.scenario("fetch"):
+                for _ in range(args.iterations):
+                    address = next(addresses)
+                    with recorder.stage("fetch.cold"):
+                        token_service.get_token_info(address)
+                    with recorder.stage("fetch.cached"):
+                        token_service.get_token_info(address)
+
+        if "analyze" in scenarios:
+            with recorder.scenario("analyze"):
+                for _ in range(args.iterations):
+                    with recorder.stage("analyze_token"):
+                        analyzer.analyze_token(next(addresses))
+
+        if "analyze_parallel" in scenarios:
+            with recorder.scenario("analyze_parallel"):
+                for _ in range(args.iterations):
+                    with recorder.stage("analyze_token.parallel"):
+                        analyzer.analyze_token(next(addresses), parallel=True)
+
+        if "tweet" in scenarios:
+            with recorder.scenario("tweet"):
+                for _ in range(args.iterations):
+                    with recorder.stage("analyze_and_tweet_token"):
+                        analyze_and_tweet_token(
+                            next(addresses), twitter_client=twitter_client,
+                            tavily_client=tavily_client, analyzer=analyzer,
+                        )
+
+        if "batch" in scenarios:
+            with recorder.scenario("batch"):
+                for _ in range(args.iterations):
+                    batch = [next(addresses) for _ in range(args.batch_size)]
+                    with recorder.stage(f"batch.x{args.batch_size}"):
+                        for result in analyzer.analyze_many(batch, concurrency=args.concurrency):
+                            recorder.samples["batch.token"].append(result.elapsed)
+
+    for fake in fakes.values():
+        fake.stop()
+    token_service.close()
+
+    report = recorder.report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if args.metrics:
+        print()
+        print(metrics.prometheus_text())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
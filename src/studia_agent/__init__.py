@@ -1,10 +1,23 @@
-from .tools import TwitterTools
-from .researcher import TokenAnalyzer
-from .agents import create_twitter_agents
-from .services.token_service import TokenService
+from importlib import import_module
 
+# Submodules are imported on first attribute access so that importing the
+# package (e.g. for the CLI or a worker) does not pull in crewai or tweepy.
+_EXPORTS = {
+    "TwitterTools": ".tools",
+    "TokenAnalyzer": ".researcher",
+    "create_twitter_agents": ".agents",
+    "TokenService": ".services.token_service",
+    "TokenSnapshot": ".services.token_snapshot",
+}
 
+__all__ = list(_EXPORTS)
 
 __version__ = "0.1.0"
 
-# This can be empty or contain package initialization code 
\ No newline at end of file
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
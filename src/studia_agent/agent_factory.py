@@ -0,0 +1,105 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from crewai import LLM, Agent
+from .llm_cache import CompletionCache
+from .routing import Route, RoutedLLM, RoutingConfig
+
+
+class AgentFactory:
+    """
+    Cache of configured LLM clients and agents.
+
+    LLM clients are stateless between calls, so one instance per
+    (model, temperature) is shared by every thread and keeps its HTTP
+    connections warm. Agents carry per-run state (executor, crew, counters)
+    and are therefore pooled per thread: a worker reuses its own agents across
+    tokens, while concurrent workers never share an agent.
+
+    When a CompletionCache is given, or configured through STUDIA_LLM_CACHE,
+    every LLM client answers repeated prompts from it. Each agent's model,
+    token limit, timeout, latency budget and streaming come from a
+    RoutingConfig (STUDIA_ROUTING), keyed by the agent's role.
+    """
+
+    def __init__(self, completion_cache: Optional[CompletionCache] = None,
+                 routing: Optional[RoutingConfig] = None,
+                 on_token: Optional[Callable[[str], None]] = None):
+        self._lock = threading.Lock()
+        self._llms: Dict[Route, LLM] = {}
+        self._local = threading.local()
+        self._completion_cache = completion_cache
+        self._cache_resolved = completion_cache is not None
+        self._routing = routing
+        # Receives streamed completion text for routes with stream enabled.
+        self.on_token = on_token
+
+    @property
+    def completion_cache(self) -> Optional[CompletionCache]:
+        # Resolved on first use so a .env loaded after import is honoured.
+        with self._lock:
+            if not self._cache_resolved:
+                self._completion_cache = CompletionCache.from_env()
+                self._cache_resolved = True
+            return self._completion_cache
+
+    @property
+    def routing(self) -> RoutingConfig:
+        with self._lock:
+            if self._routing is None:
+                self._routing = RoutingConfig.from_env()
+            return self._routing
+
+    def llm(self, model: str = "gpt-4", temperature: float = 0.7, route: Optional[Route] = None) -> LLM:
+        """Return the shared LLM client for ``route`` (or a plain model/temperature route)."""
+        route = route or Route(model=model, temperature=temperature)
+        cache = self.completion_cache
+        with self._lock:
+            if route not in self._llms:
+                self._llms[route] = RoutedLLM(route, cache=cache, on_token=self._emit_token)
+            return self._llms[route]
+
+    def _emit_token(self, text: str):
+        if self.on_token is not None:
+            self.on_token(text)
+
+    def agent(
+        self,
+        role: str,
+        build: Callable[[LLM], Agent],
+        model: str = "gpt-4",
+        temperature: float = 0.7,
+        scope: Tuple[Any, ...] = (),
+    ) -> Agent:
+        """
+        Return this thread's agent for ``(role, route, scope)``, calling
+        ``build(llm)`` on first use. ``model`` and ``temperature`` are the
+        role's defaults; the routing config may override them. ``scope`` holds
+        the objects the agent's tools are bound to (services, API clients),
+        compared by identity, so agents built for different clients are never
+        mixed up.
+        """
+        agents = getattr(self._local, "agents", None)
+        if agents is None:
+            agents = self._local.agents = {}
+        route = self.routing.route(role, model, temperature)
+        key: Hashable = (role, route, tuple(id(obj) for obj in scope))
+        entry = agents.get(key)
+        # Keep the scope objects alive with the agent so their ids stay unique.
+        if entry is None or any(a is not b for a, b in zip(entry[1], scope)):
+            entry = agents[key] = (build(self.llm(route=route)), scope)
+        agent = entry[0]
+        # crewai keeps per-run state on the agent: the retry counter only grows
+        # (so an old failure would use up retries of later runs) and tool
+        # results are appended forever. Start every run from a clean slate.
+        agent._times_executed = 0
+        agent.tools_results = []
+        return agent
+
+    def clear(self):
+        """Drop cached LLM clients and the calling thread's agents."""
+        with self._lock:
+            self._llms.clear()
+        self._local.agents = {}
+
+
+default_factory = AgentFactory()
@@ -1,27 +1,12 @@
-import os
-from typing import List
+from typing import List, Optional
 from crewai import Agent, Task
-from tavily import TavilyClient
 from langchain.tools import Tool
-from langchain_openai import ChatOpenAI
 from .services.token_service import TokenService
-
-# Initialize tools properly
-def web_search(query: str) -> str:
-    """Search the web for information about a topic."""
-    try:
-        tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-        search_result = tavily.search(query=query)
-        return str(search_result)
-    except Exception as e:
-        return f"Error searching: {str(e)}"
-
-# Create tools
-search_tool = Tool(
-    name="WebSearch",
-    func=web_search,
-    description="Search the web for information. Input should be a simple search query string."
-)
+from .agent_factory import AgentFactory, default_factory
+from .services.search_service import SearchService
+from .clients import get_search_service
+from .instrumentation import traced
+from .prompt_budget import budgeted
 
 class TwitterTools:
     def __init__(self, twitter_client=None):
@@ -33,46 +18,54 @@ class TwitterTools:
         # Instead, just return what would be tweeted
         return f"[PREVIEW] Tweet content: {content}"
 
-def create_twitter_agents(twitter_client=None, tavily_client=None):
-    """Create the Twitter agents with both Twitter and Tavily clients."""
+def _post_tweet_tool(twitter_client):
     twitter_tools = TwitterTools(twitter_client)
-    twitter_tool = Tool(
+    return Tool(
         name="PostTweet",
-        func=twitter_tools.post_tweet,
+        func=traced("tool.PostTweet")(twitter_tools.post_tweet),
         description="Post a tweet to Twitter. Input should be the tweet content as a string."
     )
 
-    # Update web_search to use the passed tavily_client
-    def web_search(query: str) -> str:
-        """Search the web for information about a topic."""
-        try:
-            if tavily_client:
-                search_result = tavily_client.search(query=query)
-                return str(search_result)
-            else:
-                return "Error: Tavily client not initialized"
-        except Exception as e:
-            return f"Error searching: {str(e)}"
-
-    search_tool = Tool(
+def _search_tool(search_service: SearchService):
+    return Tool(
         name="WebSearch",
-        func=web_search,
+        func=budgeted("tool.WebSearch")(traced("tool.WebSearch")(search_service.search_digest)),
         description="Search the web for information. Input should be a simple search query string."
     )
 
-    content_researcher = Agent(
+def _multi_search_tool(search_service: SearchService):
+    return Tool(
+        name="MultiWebSearch",
+        func=budgeted("tool.MultiWebSearch")(traced("tool.MultiWebSearch")(search_service.search_many_digest)),
+        description=f"""Search the web for several queries at once and get one merged, ranked list of
+        results. Prefer this over repeated WebSearch calls when exploring different angles. Input should
+        be a JSON list of up to {search_service.max_queries} query strings, e.g. ["query one", "query two"]."""
+    )
+
+def create_twitter_agents(twitter_client=None, tavily_client=None, factory: AgentFactory = default_factory,
+                          search_service: Optional[SearchService] = None):
+    """Create the Twitter agents with both Twitter and Tavily clients.
+
+    Agents and their LLM clients are reused from ``factory`` across calls, and
+    all agents share one cached SearchService for ``tavily_client``.
+    """
+    if search_service is None:
+        search_service = get_search_service(tavily_client)
+    scope = (twitter_client, search_service)
+
+    content_researcher = factory.agent('Social Media Research Intern', lambda llm: Agent(
         role='Social Media Research Intern',
         goal='Find relevant and accurate information about trending topics',
         backstory="""You're a research-focused intern who specializes in finding accurate 
         and relevant information. You focus on substance over style, ensuring all information 
         is factual and valuable. You always verify information through web searches.""",
         allow_delegation=False,
-        tools=[search_tool],
-        llm=ChatOpenAI(temperature=0.7, model="gpt-4"),
+        tools=[_multi_search_tool(search_service), _search_tool(search_service)],
+        llm=llm,
         verbose=True
-    )
+    ), model="gpt-4", temperature=0.7, scope=scope)
 
-    content_writer = Agent(
+    content_writer = factory.agent('Professional Content Writer', lambda llm: Agent(
         role='Professional Content Writer',
         goal='Write clear, concise tweets that fit Twitter\'s character limit',
         backstory="""You're a professional writer who specializes in extremely concise communication. 
@@ -82,11 +75,11 @@ def create_twitter_agents(twitter_client=None, tavily_client=None):
         complex information in brief, impactful messages, focusing on the most essential points only.
         You verify facts before including them in tweets.""",
         allow_delegation=False,
-        tools=[search_tool],
-        llm=ChatOpenAI(temperature=0.7, model="gpt-4")
-    )
+        tools=[_search_tool(search_service)],
+        llm=llm
+    ), model="gpt-4", temperature=0.7, scope=scope)
 
-    tweet_publisher = Agent(
+    tweet_publisher = factory.agent('Content Quality Manager', lambda llm: Agent(
         role='Content Quality Manager',
         goal='Ensure tweets are professional, appropriate, and within length limits',
         backstory="""You're the final checkpoint for content quality. You ensure tweets are 
@@ -96,16 +89,18 @@ def create_twitter_agents(twitter_client=None, tavily_client=None):
         be correct while maintaining the key message. You remove any hashtags and ensure 
         minimal emoji usage. You fact-check claims before publishing.""",
         allow_delegation=False,
-        tools=[twitter_tool, search_tool],
-        llm=ChatOpenAI(temperature=0.7, model="gpt-4")
-    )
+        tools=[_post_tweet_tool(twitter_client), _search_tool(search_service)],
+        llm=llm
+    ), model="gpt-4", temperature=0.7, scope=scope)
 
     return content_researcher, content_writer, tweet_publisher
 
 def create_twitter_tasks(topic: str, content_researcher, content_writer, tweet_publisher) -> List[Task]:
     research_task = Task(
         description=f"""Research the latest developments and important information about {topic}. 
-        Focus on factual, valuable insights that would be worth sharing.""",
+        Focus on factual, valuable insights that would be worth sharing.
+        Cover several angles (news, market data, community, risks) in a single MultiWebSearch call
+        rather than searching them one by one.""",
         expected_output="""A comprehensive but concise summary of the most relevant and 
         accurate information about the topic.""",
         agent=content_researcher
@@ -143,9 +138,9 @@ def create_twitter_tasks(topic: str, content_researcher, content_writer, tweet_p
 
     return [research_task, writing_task, publishing_task]
 
-def create_token_analysis_agents(token_service):
-    """Create agents specialized in token analysis"""
-    
+def _token_tool(token_service):
+    @budgeted("tool.GetTokenInfo")
+    @traced("tool.GetTokenInfo")
     def get_token_info(token_address: str) -> str:
         """Get token info and handle the response"""
         if isinstance(token_address, str) and token_address.startswith('{'):
@@ -153,53 +148,83 @@ def create_token_analysis_agents(token_service):
             data = json.loads(token_address)
             token_address = data.get('token_address')
         
-        result = token_service.get_token_info(token_address)
-        return str(result) if result else "No data found for token"
+        snapshot = token_service.get_token_snapshot(token_address)
+        return snapshot.render() if snapshot else "No data found for token"
 
     # Create tool for token info
-    token_tool = Tool(
+    return Tool(
         name="GetTokenInfo",
         func=get_token_info,
         description="Get detailed information about a token using its address. Input should be a token address string."
     )
 
-    token_researcher = Agent(
+def create_token_analysis_agents(token_service, factory: AgentFactory = default_factory):
+    """Create agents specialized in token analysis
+
+    Agents and their LLM clients are reused from ``factory`` across calls.
+    """
+    scope = (token_service,)
+
+    token_researcher = factory.agent('Token Research Analyst', lambda llm: Agent(
         role='Token Research Analyst',
         goal='Analyze token data and extract key metrics',
         backstory="""You're a cryptocurrency analyst specializing in token metrics and market analysis. 
         You focus on providing accurate, data-driven insights about tokens, including price, liquidity, 
         market cap, and risk assessment.""",
         allow_delegation=False,
-        tools=[token_tool],
-        llm=ChatOpenAI(temperature=0.5, model="gpt-4"),
+        tools=[_token_tool(token_service)],
+        llm=llm,
         verbose=True
-    )
+    ), model="gpt-4", temperature=0.5, scope=scope)
 
-    market_analyst = Agent(
+    market_analyst = factory.agent('Market Intelligence Specialist', lambda llm: Agent(
         role='Market Intelligence Specialist',
         goal='Analyze market dynamics and price movements',
         backstory="""You're a market intelligence specialist who excels at interpreting price movements, 
         liquidity patterns, and market trends. You provide clear insights about token performance and 
         market behavior.""",
         allow_delegation=False,
-        tools=[token_tool],
-        llm=ChatOpenAI(temperature=0.5, model="gpt-4")
-    )
+        tools=[_token_tool(token_service)],
+        llm=llm
+    ), model="gpt-4", temperature=0.5, scope=scope)
 
-    risk_analyst = Agent(
+    risk_analyst = factory.agent('Risk Assessment Specialist', lambda llm: Agent(
         role='Risk Assessment Specialist',
         goal='Evaluate token risks and security aspects',
         backstory="""You're a risk assessment specialist who analyzes token security, identifies potential 
         risks, and evaluates the overall safety of tokens. You provide clear risk assessments and 
         security recommendations.""",
         allow_delegation=False,
-        tools=[token_tool],
-        llm=ChatOpenAI(temperature=0.5, model="gpt-4")
-    )
+        tools=[_token_tool(token_service)],
+        llm=llm
+    ), model="gpt-4", temperature=0.5, scope=scope)
 
     return token_researcher, market_analyst, risk_analyst
 
-def create_token_tasks(token_address: str, token_researcher, market_analyst, risk_analyst) -> List[Task]:
+def create_token_tasks(token_address: str, token_researcher, market_analyst, risk_analyst, snapshot=None,
+                       indicators=None) -> List[Task]:
+    """Create the research, market and risk tasks for a token.
+
+    When a prefetched ``snapshot`` is given, its rendered data is embedded in
+    every task so the agents can answer without a GetTokenInfo round trip.
+    ``indicators`` computed from the token's snapshot history are added to
+    the market and risk tasks.
+    """
+    token_data = f"""
+
+        Token data (already fetched, no need to call GetTokenInfo):
+        {snapshot.render()}""" if snapshot is not None else ""
+    market_history = risk_history = ""
+    if indicators is not None:
+        market_history = f"""
+
+        Precomputed indicators from stored snapshots (use these numbers as given, do not recompute them):
+        {indicators.render_market()}"""
+        risk_history = f"""
+
+        Precomputed indicators from stored snapshots (use these numbers as given, do not recompute them):
+        {indicators.render_risk()}"""
+
     research_task = Task(
         description=f"""Analyze the token data for {token_address}. Focus on:
         1. Basic token information (name, symbol, decimals)
@@ -208,16 +233,13 @@ def create_token_tasks(token_address: str, token_researcher, market_analyst, ris
         4. Social media presence and creator information
         
         The data will be in this format:
-        - token.name: Token name
-        - token.symbol: Token symbol
-        - token.decimals: Number of decimals
-        - token.description: Token description
-        - pools[0].price.usd: Current price in USD
-        - pools[0].marketCap.usd: Market cap in USD
-        - pools[0].liquidity.usd: Liquidity in USD
-        - token.extensions: Social media links
+        - token: Token name, symbol, address and number of decimals
+        - market.price_usd: Current price in USD
+        - market.market_cap_usd: Market cap in USD
+        - market.liquidity_usd: Liquidity in USD
+        - socials: Social media links the token lists
         
-        Provide a comprehensive but concise analysis of the token's fundamental metrics.""",
+        Provide a comprehensive but concise analysis of the token's fundamental metrics.""" + token_data,
         expected_output="""A clear summary of the token's key metrics and characteristics, 
         including name, symbol, price, market cap, liquidity, and social presence.""",
         agent=token_researcher
@@ -231,12 +253,12 @@ def create_token_tasks(token_address: str, token_researcher, market_analyst, ris
         4. Market trends from events data
         
         The data will include:
-        - events.1h.priceChangePercentage: 1-hour price change
-        - events.24h.priceChangePercentage: 24-hour price change
-        - pools[0].liquidity: Pool liquidity data
-        - buys/sells/txns: Trading activity metrics
+        - change.1h: 1-hour price change
+        - change.24h: 24-hour price change
+        - market.liquidity_usd: Pool liquidity
+        - activity.txns/buys/sells/volume_usd: Trading activity metrics
         
-        Provide clear insights about market behavior and performance.""",
+        Provide clear insights about market behavior and performance.""" + token_data + market_history,
         expected_output="""A detailed market analysis highlighting price movements, 
         liquidity status, trading activity, and key trends.""",
         agent=market_analyst
@@ -251,11 +273,11 @@ def create_token_tasks(token_address: str, token_researcher, market_analyst, ris
         
         The data will include:
         - risk.score: Overall risk score
-        - risk.risks: Array of specific risks
+        - risk.risks: Specific risks with their level
         - risk.rugged: Rug pull indicator
-        - pools[0].security: Security authorities
+        - security: Mint and freeze authority status
         
-        Provide a thorough risk assessment and security evaluation.""",
+        Provide a thorough risk assessment and security evaluation.""" + token_data + risk_history,
         expected_output="""A comprehensive risk analysis covering security aspects,
         specific risks identified, and overall safety assessment.""",
         agent=risk_analyst
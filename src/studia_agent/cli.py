@@ -0,0 +1,285 @@
+import argparse
+import sys
+from typing import List, Optional
+
+
+def _configure_routing(args):
+    import os
+    from .agent_factory import default_factory
+    from .routing import Route
+
+    if args.routing:
+        os.environ["STUDIA_ROUTING"] = args.routing
+    if args.stream:
+        routing = default_factory.routing
+        routing.default = routing.default.merged(Route(stream=True))
+        default_factory.on_token = lambda text: (sys.stderr.write(text), sys.stderr.flush())
+
+
+def _dedup(args):
+    if not args.dedup:
+        return None
+    from .services.dedup_index import DuplicateIndex
+    return DuplicateIndex(args.dedup, threshold=args.dedup_threshold)
+
+
+def _journal(args):
+    if not args.journal:
+        return None
+    from .journal import RunJournal
+    return RunJournal(args.journal)
+
+
+def _history(args):
+    if not args.history:
+        return None
+    from .services.timeseries import TimeSeriesStore
+    return TimeSeriesStore(args.history)
+
+
+def _analyze(args) -> int:
+    # Heavy imports stay inside the command so `--help` starts instantly.
+    from .clients import get_token_service
+    from .researcher import TokenAnalyzer
+
+    analyzer = TokenAnalyzer(get_token_service(), history=_history(args))
+    if args.no_tweet:
+        print(analyzer.analyze_token(args.token_address, parallel=args.parallel))
+        return 0
+
+    from .main import analyze_and_tweet_token
+    outbox = None
+    if args.outbox:
+        from .outbox import TweetOutbox
+        outbox = TweetOutbox(args.outbox)
+    analysis_result, tweet_result = analyze_and_tweet_token(
+        args.token_address, analyzer=analyzer, parallel=args.parallel, outbox=outbox, dedup=_dedup(args),
+        journal=_journal(args), run_id=args.run_id, resume=args.resume,
+    )
+    print(f"\nAnalysis complete. Tweet result: {tweet_result}")
+    return 0
+
+
+def _publish(args) -> int:
+    import logging
+    from .clients import get_twitter_client
+    from .outbox import OutboxPublisher, TweetOutbox
+
+    if not args.trace:
+        # The publisher reports each item through logging
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    twitter_client = get_twitter_client(verify=False, wait_on_rate_limit=False)
+    if twitter_client is None:
+        print("Twitter client not initialized. Please check your credentials.")
+        return 1
+    publisher = OutboxPublisher(TweetOutbox(args.outbox), twitter_client, poll_interval=args.poll_interval)
+    if args.once:
+        publisher.outbox.recover_interrupted()
+        publisher.publish_pending()
+        print(f"Outbox: {publisher.outbox.counts()}")
+        return 0
+    try:
+        publisher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _watch(args) -> int:
+    from .clients import get_token_service
+    from .researcher import TokenAnalyzer
+    from .watchlist import Thresholds, WatchlistMonitor
+
+    addresses = _read_addresses(args)
+    if not addresses:
+        print("No token addresses to watch.")
+        return 1
+
+    thresholds = Thresholds.from_env()
+    for name in ("price_pct", "liquidity_pct", "market_cap_pct", "risk_score"):
+        if getattr(args, name) is not None:
+            setattr(thresholds, name, getattr(args, name))
+    thresholds.trigger_on_new = not args.skip_initial
+
+    token_service = get_token_service()
+    history = _history(args)
+    dedup = _dedup(args)
+    journal = _journal(args)
+    # The monitor records every polled snapshot; the analyzer only reads them
+    analyzer = TokenAnalyzer(token_service, history=history, record_history=False)
+    outbox = None
+    if args.outbox:
+        from .outbox import TweetOutbox
+        outbox = TweetOutbox(args.outbox)
+
+    def on_trigger(event):
+        print(f"Change detected: {event.describe()}")
+        if args.no_tweet:
+            print(analyzer.analyze_token(event.address, parallel=args.parallel))
+        else:
+            from .main import analyze_and_tweet_token
+            analyze_and_tweet_token(event.address, analyzer=analyzer, parallel=args.parallel, outbox=outbox,
+                                    dedup=dedup, journal=journal)
+
+    monitor = WatchlistMonitor(token_service, addresses, thresholds, on_trigger=on_trigger,
+                               state_path=args.state, history=history)
+    try:
+        monitor.run(interval=args.interval, max_polls=1 if args.once else None)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _serve(args) -> int:
+    from .clients import get_token_service
+    from .researcher import TokenAnalyzer
+    from .server import AnalysisService, serve
+
+    outbox = None
+    if args.outbox:
+        from .outbox import TweetOutbox
+        outbox = TweetOutbox(args.outbox)
+    service = AnalysisService(
+        TokenAnalyzer(get_token_service(), history=_history(args)),
+        workers=args.workers,
+        queue_size=args.queue_size,
+        ttl=args.ttl,
+        parallel=args.parallel,
+        outbox=outbox,
+        dedup=_dedup(args),
+        journal=_journal(args),
+    )
+    serve(service, args.host, args.port, request_timeout=args.request_timeout)
+    return 0
+
+
+def _read_addresses(args) -> List[str]:
+    addresses = list(args.token_addresses)
+    if args.file:
+        with open(args.file) as f:
+            addresses += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return addresses
+
+
+def _screen(args) -> int:
+    from .clients import get_token_service
+    from .prescore import PreScorer, ScoringRules
+    from .researcher import TokenAnalyzer
+
+    addresses = _read_addresses(args)
+    if not addresses:
+        print("No token addresses to screen.")
+        return 1
+    rules = ScoringRules.from_file(args.rules) if args.rules else ScoringRules()
+    analyzer = TokenAnalyzer(get_token_service(), history=_history(args))
+    selected = analyzer.screen(addresses, PreScorer(rules), top_n=args.top, min_score=args.min_score)
+    print(f"Selected {len(selected)} of {len(addresses)} tokens")
+    for token in selected:
+        print(token.describe())
+
+    if args.analyze:
+        for result in analyzer.analyze_many([token.address for token in selected],
+                                            concurrency=args.concurrency, parallel=args.parallel):
+            if result.ok:
+                print(f"\n{result.token_address} ({result.elapsed:.1f}s)\n{result.result}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="studia-agent", description="Studia token analysis agents")
+    parser.add_argument("--trace", action="store_true", help="Log spans and messages as JSON lines on stderr")
+    parser.add_argument("--metrics", metavar="PATH", help="Write a Prometheus text snapshot here on exit")
+    parser.add_argument("--routing", metavar="PATH", help="Model routing config (default: $STUDIA_ROUTING)")
+    parser.add_argument("--stream", action="store_true", help="Stream completions and echo them on stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="Analyze a token and tweet the result")
+    analyze.add_argument("token_address", help="Solana token address")
+    analyze.add_argument("--no-tweet", action="store_true", help="Only run the analysis; never builds a Twitter client")
+    analyze.add_argument("--parallel", action="store_true", help="Run the three analysts concurrently")
+    analyze.add_argument("--outbox", metavar="PATH", help="Queue the tweet in this outbox instead of posting it")
+    analyze.add_argument("--history", metavar="DIR", help="Record snapshots here and give the analysts indicators")
+    analyze.add_argument("--dedup", metavar="PATH", help="Skip tweets that near-duplicate earlier ones in this index")
+    analyze.add_argument("--dedup-threshold", type=float, help="Similarity from 0 to 1 counted as a duplicate")
+    analyze.add_argument("--journal", metavar="PATH", help="Record each pipeline stage here")
+    analyze.add_argument("--run-id", help="Resume (or start) the run with this ID")
+    analyze.add_argument("--resume", action="store_true", help="Continue the token's latest unfinished run")
+    analyze.set_defaults(handler=_analyze)
+
+    publish = commands.add_parser("publish", help="Publish queued tweets from an outbox")
+    publish.add_argument("--outbox", metavar="PATH", help="Outbox database (default: $STUDIA_OUTBOX_DB)")
+    publish.add_argument("--once", action="store_true", help="Drain due tweets and exit instead of running forever")
+    publish.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between outbox polls")
+    publish.set_defaults(handler=_publish)
+
+    watch = commands.add_parser("watch", help="Poll tokens and analyze only those that changed significantly")
+    watch.add_argument("token_addresses", nargs="*", help="Solana token addresses")
+    watch.add_argument("--file", metavar="PATH", help="File with one token address per line")
+    watch.add_argument("--interval", type=float, default=60.0, help="Seconds between polls")
+    watch.add_argument("--once", action="store_true", help="Poll once and exit")
+    watch.add_argument("--state", metavar="PATH", help="JSON file keeping baselines across restarts")
+    watch.add_argument("--price-pct", type=float, help="Price move in percent that triggers analysis")
+    watch.add_argument("--liquidity-pct", type=float, help="Liquidity move in percent that triggers analysis")
+    watch.add_argument("--market-cap-pct", type=float, help="Market cap move in percent that triggers analysis")
+    watch.add_argument("--risk-score", type=float, help="Absolute risk score change that triggers analysis")
+    watch.add_argument("--skip-initial", action="store_true", help="Do not analyze tokens on their first snapshot")
+    watch.add_argument("--no-tweet", action="store_true", help="Only run the analysis")
+    watch.add_argument("--parallel", action="store_true", help="Run the three analysts concurrently")
+    watch.add_argument("--outbox", metavar="PATH", help="Queue tweets in this outbox instead of posting them")
+    watch.add_argument("--history", metavar="DIR", help="Record every polled snapshot here for indicators")
+    watch.add_argument("--dedup", metavar="PATH", help="Skip tweets that near-duplicate earlier ones in this index")
+    watch.add_argument("--dedup-threshold", type=float, help="Similarity from 0 to 1 counted as a duplicate")
+    watch.add_argument("--journal", metavar="PATH", help="Record each pipeline stage here")
+    watch.set_defaults(handler=_watch)
+
+    screen = commands.add_parser("screen", help="Rank many tokens without LLM calls and optionally analyze the best")
+    screen.add_argument("token_addresses", nargs="*", help="Solana token addresses")
+    screen.add_argument("--file", metavar="PATH", help="File with one token address per line")
+    screen.add_argument("--rules", metavar="PATH", help="JSON file with ScoringRules fields and weights")
+    screen.add_argument("--top", type=int, help="Keep at most this many tokens")
+    screen.add_argument("--min-score", type=float, help="Keep only tokens scoring at least this much")
+    screen.add_argument("--analyze", action="store_true", help="Run the analysis crews on the selected tokens")
+    screen.add_argument("--concurrency", type=int, default=4, help="Tokens analyzed at the same time")
+    screen.add_argument("--parallel", action="store_true", help="Run the three analysts concurrently")
+    screen.add_argument("--history", metavar="DIR", help="Record snapshots here and give the analysts indicators")
+    screen.set_defaults(handler=_screen)
+
+    serve = commands.add_parser("serve", help="Serve analyses over a local HTTP/JSON API")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    serve.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    serve.add_argument("--workers", type=int, default=4, help="Analyses run at the same time")
+    serve.add_argument("--queue-size", type=int, default=16, help="Analyses waiting for a worker before 429s")
+    serve.add_argument("--ttl", type=float, default=300.0, help="Seconds a finished result is served from cache")
+    serve.add_argument("--request-timeout", type=float, help="Seconds a request waits before a 504")
+    serve.add_argument("--parallel", action="store_true", help="Run the three analysts concurrently")
+    serve.add_argument("--outbox", metavar="PATH", help="Queue tweets from POST /tweet instead of posting them")
+    serve.add_argument("--history", metavar="DIR", help="Record snapshots here and give the analysts indicators")
+    serve.add_argument("--dedup", metavar="PATH", help="Skip tweets that near-duplicate earlier ones in this index")
+    serve.add_argument("--dedup-threshold", type=float, help="Similarity from 0 to 1 counted as a duplicate")
+    serve.add_argument("--journal", metavar="PATH", help="Record each tweet pipeline stage here")
+    serve.set_defaults(handler=_serve)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    from dotenv import load_dotenv
+    from .instrumentation import configure_logging, metrics
+
+    # Before routing is configured, so STUDIA_ROUTING and friends can come from .env
+    load_dotenv()
+    if args.trace:
+        configure_logging()
+    if args.routing or args.stream:
+        _configure_routing(args)
+    try:
+        return args.handler(args)
+    finally:
+        if args.metrics:
+            with open(args.metrics, "w") as f:
+                f.write(metrics.prometheus_text())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a client that failed to initialize is built again
+FAILED_CLIENT_RETRY = 60.0
+
+
+class ClientRegistry:
+    """
+    Thread-safe memo of client instances keyed by name.
+
+    Clients are built outside the registry lock (building one may mean a
+    network round trip), with at most one build per key at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Hashable, Any] = {}
+        self._expires: Dict[Hashable, float] = {}
+        self._building: Dict[Hashable, threading.Lock] = {}
+
+    def _lookup(self, key: Hashable):
+        # Caller holds the lock.
+        if key in self._clients and self._expires.get(key, float("inf")) > time.monotonic():
+            return True, self._clients[key]
+        return False, None
+
+    def get(self, key: Hashable, factory: Callable[[], Any],
+            retry_after: Optional[Callable[[Any], Optional[float]]] = None) -> Any:
+        """
+        Return the client for ``key``, building it with ``factory`` on first use.
+
+        ``retry_after`` maps a freshly built value to the number of seconds
+        it may be reused (None: for good), e.g. to retry a failed
+        initialization after a short backoff rather than on every call.
+        """
+        with self._lock:
+            found, client = self._lookup(key)
+            if found:
+                return client
+            building = self._building.setdefault(key, threading.Lock())
+
+        with building:
+            with self._lock:
+                found, client = self._lookup(key)
+                if found:
+                    return client
+            client = factory()
+            delay = retry_after(client) if retry_after is not None else None
+            with self._lock:
+                self._clients[key] = client
+                if delay is not None:
+                    self._expires[key] = time.monotonic() + delay
+                else:
+                    self._expires.pop(key, None)
+            return client
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._clients.pop(key, None)
+            self._expires.pop(key, None)
+
+    def reset(self):
+        with self._lock:
+            self._clients.clear()
+            self._expires.clear()
+
+
+registry = ClientRegistry()
+
+
+def _twitter_credentials():
+    return (
+        os.getenv("TWITTER_API_KEY", ""),
+        os.getenv("TWITTER_API_SECRET", ""),
+        os.getenv("TWITTER_ACCESS_TOKEN", ""),
+        os.getenv("TWITTER_ACCESS_TOKEN_SECRET", ""),
+    )
+
+
+def _build_twitter_client(wait_on_rate_limit: bool, verify: bool):
+    import tweepy
+
+    api_key, api_secret, access_token, access_token_secret = _twitter_credentials()
+    if not all([api_key, api_secret, access_token, access_token_secret]):
+        logger.info("Twitter credentials not configured")
+        return None
+
+    try:
+        logger.info("Initializing Twitter client")
+        # Initialize Twitter client with v2 API
+        client = tweepy.Client(
+            consumer_key=api_key,
+            consumer_secret=api_secret,
+            access_token=access_token,
+            access_token_secret=access_token_secret,
+            bearer_token=os.getenv("TWITTER_BEARER_TOKEN", ""),
+            wait_on_rate_limit=wait_on_rate_limit
+        )
+        if not verify:
+            return client
+
+        # Test if client is properly authenticated
+        test_response = client.get_me()
+        if test_response.data:
+            logger.info("Authenticated with Twitter as @%s", test_response.data.username)
+            return client
+        logger.warning("Failed to authenticate with Twitter")
+    except Exception as e:
+        response = getattr(e, "response", None)
+        if response is not None:
+            logger.warning("Error initializing Twitter client: %s (status %s: %s)", e,
+                           response.status_code, response.text)
+        else:
+            logger.warning("Error initializing Twitter client: %s", e)
+    return None
+
+
+def get_twitter_client(verify: bool = True, wait_on_rate_limit: bool = True):
+    """
+    Return the shared tweepy client, or None without credentials.
+
+    With ``verify`` the first call checks the credentials with ``get_me()``.
+    A client, or None for missing credentials, is memoized for the process;
+    a failed check (e.g. a network error at startup) is retried after
+    FAILED_CLIENT_RETRY seconds instead of leaving the process in preview
+    mode for good.
+    """
+    return registry.get(
+        ("twitter", verify, wait_on_rate_limit),
+        lambda: _build_twitter_client(wait_on_rate_limit, verify),
+        retry_after=lambda client: FAILED_CLIENT_RETRY if client is None and all(_twitter_credentials()) else None,
+    )
+
+
+def _build_tavily_client():
+    api_key = os.getenv("TAVILY_API_KEY", "")
+    if not api_key:
+        return None
+    try:
+        from tavily import TavilyClient
+        return TavilyClient(api_key=api_key)
+    except Exception as e:
+        logger.warning("Error initializing Tavily client: %s", e)
+        return None
+
+
+def get_tavily_client():
+    """Return the shared Tavily client, or None without an API key."""
+    return registry.get("tavily", _build_tavily_client)
+
+
+def get_token_service():
+    """Return the process-wide TokenService so its pool and cache are shared."""
+    from .services.token_service import TokenService
+    return registry.get("token_service", TokenService)
+
+
+def get_search_service(tavily_client=None):
+    """Return the SearchService shared by all agents using ``tavily_client``.
+
+    With no client, the service builds the default Tavily client on first use.
+    """
+    from .services.search_service import SearchService
+    return registry.get(("search", tavily_client), lambda: SearchService(tavily_client))
+
+
+def get_prompt_budgeter():
+    """Return the process-wide PromptBudgeter configured from STUDIA_PROMPT_BUDGETS."""
+    from .prompt_budget import PromptBudgeter
+    return registry.get("prompt_budgeter", PromptBudgeter.from_env)
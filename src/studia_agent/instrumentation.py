@@ -0,0 +1,296 @@
+import json
+import time
+import uuid
+import logging
+import weakref
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("studia_agent.trace")
+
+# Upper bounds (seconds) of the latency histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("studia_span", default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, Any], float]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Thread-safe counters and latency histograms with Prometheus export.
+
+    Collectors registered with :meth:`register_collector` are called at
+    snapshot time and report gauges owned by other objects, such as cache
+    hit/miss counters. Registering a name again replaces its collector.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Sample]]] = {}
+
+    def incr(self, name: str, amount: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            # bucket counts..., then sum and count
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0.0] * (len(BUCKETS) + 2)
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[Sample]]):
+        with self._lock:
+            self._collectors[name] = collector
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counters, histogram summaries and collected gauges as a dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+            collectors = list(self._collectors.values())
+        gauges = [sample for collector in collectors for sample in collector()]
+        return {
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+            "histograms": [
+                {"name": name, "labels": dict(labels), "count": int(hist[-1]), "sum": round(hist[-2], 6)}
+                for (name, labels), hist in sorted(histograms.items())
+            ],
+            "gauges": [{"name": name, "labels": labels, "value": value} for name, labels, value in gauges],
+        }
+
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, list(value)) for key, value in self._histograms.items())
+            collectors = list(self._collectors.values())
+
+        def fmt(labels) -> str:
+            items = labels.items() if isinstance(labels, dict) else labels
+            inner = ",".join(f'{key}="{_escape(value)}"' for key, value in items)
+            return f"{{{inner}}}" if inner else ""
+
+        lines, typed = [], set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{fmt(labels)} {value:g}")
+        for (name, labels), hist in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for bound, count in zip(BUCKETS, hist):
+                lines.append(f"{name}_bucket{fmt(labels + (('le', f'{bound:g}'),))} {count:g}")
+            lines.append(f"{name}_bucket{fmt(labels + (('le', '+Inf'),))} {hist[-1]:g}")
+            lines.append(f"{name}_sum{fmt(labels)} {hist[-2]:.6f}")
+            lines.append(f"{name}_count{fmt(labels)} {hist[-1]:g}")
+        gauges = sorted(
+            (sample for collector in collectors for sample in collector()),
+            key=lambda sample: sample[0],
+        )
+        for name, labels, value in gauges:
+            if name not in typed:
+                lines.append(f"# TYPE {name} gauge")
+                typed.add(name)
+            lines.append(f"{name}{fmt(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "trace_id", "span_id", "parent_id", "start", "duration", "error")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], parent: Optional["Span"]):
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event": "span",
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "error": self.error,
+            **self.attrs,
+        }
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a block of work. Records ``studia_span_seconds{span=name}``, counts
+    errors and logs the span as a structured record on ``studia_agent.trace``.
+    Spans nest across threads only when the context is copied explicitly.
+    """
+    current = Span(name, attrs, _current_span.get())
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        metrics.incr("studia_span_errors_total", span=name)
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        metrics.observe("studia_span_seconds", current.duration, span=name)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(name, extra={"span": current.to_dict()})
+
+
+def traced(name: str):
+    """Decorator form of :func:`span` that keeps the wrapped signature."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "cached_prompt_tokens", "successful_requests")
+
+
+def _crew_usage(crew) -> Dict[str, int]:
+    # Agents are pooled across runs and their token counters never reset, so
+    # usage is measured as the difference around one kickoff.
+    totals = dict.fromkeys(USAGE_FIELDS, 0)
+    for agent in crew.agents:
+        process = getattr(agent, "_token_process", None)
+        if process is None:
+            continue
+        summary = process.get_summary()
+        for field in USAGE_FIELDS:
+            totals[field] += getattr(summary, field, 0) or 0
+    return totals
+
+
+def record_llm_usage(usage: Dict[str, int], **labels):
+    """Add prompt/completion token and request counts to the LLM counters."""
+    metrics.incr("studia_llm_prompt_tokens_total", usage.get("prompt_tokens", 0), **labels)
+    metrics.incr("studia_llm_completion_tokens_total", usage.get("completion_tokens", 0), **labels)
+    metrics.incr("studia_llm_cached_prompt_tokens_total", usage.get("cached_prompt_tokens", 0), **labels)
+    metrics.incr("studia_llm_requests_total", usage.get("successful_requests", 0), **labels)
+
+
+def kickoff(crew, name: str, **attrs):
+    """Run ``crew.kickoff()`` inside a span, timing each task and counting LLM tokens."""
+    with span(f"crew.{name}", **attrs) as crew_span:
+        last = [time.perf_counter()]
+        previous_callback = crew.task_callback
+
+        def on_task_done(output):
+            now = time.perf_counter()
+            agent = getattr(output, "agent", "") or ""
+            metrics.observe("studia_span_seconds", now - last[0], span=f"task.{agent.strip()}")
+            last[0] = now
+            if previous_callback is not None:
+                previous_callback(output)
+
+        crew.task_callback = on_task_done
+        before = _crew_usage(crew)
+        try:
+            return crew.kickoff()
+        finally:
+            after = _crew_usage(crew)
+            usage = {field: after[field] - before[field] for field in USAGE_FIELDS}
+            record_llm_usage(usage, crew=name)
+            crew_span.set(prompt_tokens=usage["prompt_tokens"], completion_tokens=usage["completion_tokens"])
+
+
+_cache_stats: Dict[str, "weakref.WeakSet"] = {}
+_cache_stats_lock = threading.Lock()
+
+
+def register_cache(name: str, stats):
+    """Export a CacheStats object as ``studia_cache_*{cache=name}`` gauges.
+
+    Caches registered under the same name (e.g. one search cache per client)
+    are reported as their sum while they are alive.
+    """
+    with _cache_stats_lock:
+        registered = _cache_stats.get(name)
+        if registered is None:
+            registered = _cache_stats[name] = weakref.WeakSet()
+
+            def collect():
+                with _cache_stats_lock:
+                    all_stats = list(registered)
+                totals: Dict[str, float] = {}
+                for each in all_stats:
+                    for key, value in each.as_dict().items():
+                        totals[key] = totals.get(key, 0) + value
+                for key, value in totals.items():
+                    yield f"studia_cache_{key}", {"cache": name}, value
+            metrics.register_collector(f"cache.{name}", collect)
+        registered.add(stats)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; span records carry their timing fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = getattr(record, "span", None)
+        if payload is None:
+            payload = {"event": "log", "level": record.levelname, "logger": record.name, "message": record.getMessage()}
+        payload = {"ts": round(record.created, 6), **payload}
+        return json.dumps(payload, default=str, separators=(",", ":"))
+
+
+def configure_logging(level: int = logging.INFO, stream=None):
+    """Emit studia_agent logs and spans as JSON lines (stderr by default)."""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger("studia_agent")
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    root.propagate = False
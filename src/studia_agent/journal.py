@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import uuid
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+SNAPSHOT = "snapshot"
+ANALYSIS = "analysis"
+DRAFT = "draft"
+POST = "post"
+ERROR = "error"
+
+STAGES = (SNAPSHOT, ANALYSIS, DRAFT, POST)
+
+
+class Run:
+    """The stages recorded so far for one run of the analyze-and-tweet pipeline."""
+
+    def __init__(self, journal: "RunJournal", run_id: str, token_address: str,
+                 stages: Optional[Dict[str, Any]] = None):
+        self.journal = journal
+        self.run_id = run_id
+        self.token_address = token_address
+        self.stages: Dict[str, Any] = dict(stages or {})
+
+    @property
+    def finished(self) -> bool:
+        return POST in self.stages
+
+    @property
+    def last_stage(self) -> Optional[str]:
+        done = [stage for stage in STAGES if stage in self.stages]
+        return done[-1] if done else None
+
+    def get(self, stage: str) -> Any:
+        return self.stages.get(stage)
+
+    def record(self, stage: str, data: Any):
+        self.journal.append(self.run_id, self.token_address, stage, data)
+        if stage != ERROR:
+            self.stages[stage] = data
+
+
+class RunJournal:
+    """
+    Append-only JSON Lines log of pipeline stages.
+
+    Every finished stage (snapshot, analysis, draft, post) is written as one
+    compact line ``{"run", "token", "stage", "ts", "data"}``, and failures as
+    ``error`` lines. A rerun of a given run ID reads it back and continues
+    after the last finished stage. The file is never rewritten, so it doubles
+    as a dataset for offline evaluation.
+
+    Runs are looked up in an in-memory index that reads only the lines added
+    since the last lookup (including those of other processes); finished runs
+    are kept there without their stage data.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("STUDIA_JOURNAL", "run_journal.jsonl")
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._offset = 0
+
+    def append(self, run_id: str, token_address: str, stage: str, data: Any):
+        line = json.dumps(
+            {"run": run_id, "token": token_address, "stage": stage, "ts": round(time.time(), 3), "data": data},
+            separators=(",", ":"), ensure_ascii=False, default=str,
+        )
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+
+    def _refresh(self):
+        # Caller holds the lock. Only complete lines are consumed, so a line
+        # being written right now is picked up by the next lookup.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                run = self._index.get(entry["run"])
+                if run is None:
+                    run = self._index[entry["run"]] = {
+                        "token": entry["token"], "started": entry["ts"], "stages": {}, "finished": False,
+                    }
+                if entry["stage"] == POST:
+                    run["finished"] = True
+                    run["stages"] = {}
+                elif entry["stage"] != ERROR and not run["finished"]:
+                    run["stages"][entry["stage"]] = entry["data"]
+
+    def load(self, run_id: str) -> Optional[Run]:
+        """Read ``run_id`` with all its recorded stages, finished or not."""
+        with self._lock:
+            self._refresh()
+            indexed = self._index.get(run_id)
+            if indexed is None:
+                return None
+            if not indexed["finished"]:
+                return Run(self, run_id, indexed["token"], indexed["stages"])
+        # Finished runs are not kept in memory; read their stages back from the file.
+        run = Run(self, run_id, indexed["token"])
+        for entry in self.entries():
+            if entry["run"] == run_id and entry["stage"] != ERROR:
+                run.stages[entry["stage"]] = entry["data"]
+        return run
+
+    def latest_unfinished(self, token_address: str, max_age: Optional[float] = None) -> Optional[Run]:
+        """The most recently started unfinished run for ``token_address``, if not older than ``max_age``."""
+        with self._lock:
+            self._refresh()
+            candidates = [
+                (run["started"], run_id, run) for run_id, run in self._index.items()
+                if run["token"] == token_address and not run["finished"]
+                and (max_age is None or time.time() - run["started"] <= max_age)
+            ]
+            if not candidates:
+                return None
+            _, run_id, run = max(candidates, key=lambda candidate: candidate[0])
+            return Run(self, run_id, token_address, run["stages"])
+
+    def start(self, token_address: str, run_id: Optional[str] = None, resume: bool = False,
+              max_age: Optional[float] = 3600.0) -> Run:
+        """
+        Return the run to execute: ``run_id`` if it exists, else (only with
+        ``resume``) the latest unfinished run of the token younger than
+        ``max_age`` seconds, else a new run. New triggers should start new
+        runs so they work on fresh data.
+        """
+        if run_id is not None:
+            return self.load(run_id) or Run(self, run_id, token_address)
+        if resume:
+            run = self.latest_unfinished(token_address, max_age)
+            if run is not None:
+                return run
+        return Run(self, uuid.uuid4().hex[:12], token_address)
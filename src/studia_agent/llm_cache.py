@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Union
+from crewai import LLM
+from .services.cache import CacheStats
+from .instrumentation import register_cache, span
+
+
+class CompletionCacheMiss(RuntimeError):
+    """Raised in offline mode when a completion is not in the cache."""
+
+
+class CompletionCache:
+    """
+    SQLite-backed store of LLM completions.
+
+    Entries expire after ``ttl`` seconds. When the stored text exceeds
+    ``max_bytes`` the least recently used entries are evicted. With
+    ``offline=True`` a miss raises CompletionCacheMiss instead of calling the
+    model, which allows replaying a recorded pipeline run without network.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        offline: bool = False,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = CacheStats()
+        register_cache("llm", self.stats)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed_at)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["CompletionCache"]:
+        """Build the cache from STUDIA_LLM_CACHE* variables; None if unset."""
+        path = os.getenv("STUDIA_LLM_CACHE")
+        if not path:
+            return None
+        return cls(
+            path,
+            ttl=float(os.getenv("STUDIA_LLM_CACHE_TTL", 24 * 3600)),
+            max_bytes=int(float(os.getenv("STUDIA_LLM_CACHE_MAX_MB", 256)) * 1024 * 1024),
+            offline=os.getenv("STUDIA_LLM_CACHE_OFFLINE", "").lower() in ("1", "true", "yes"),
+        )
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: Optional[float],
+        messages: Union[str, List[Dict[str, str]]],
+        stop: Optional[Union[str, List[str]]] = None,
+    ) -> str:
+        """Hash the model settings and the whitespace-normalized conversation.
+
+        Tool outputs are part of the conversation (as observations), so a
+        changed tool result produces a different key.
+        """
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        normalized = [
+            (m.get("role", ""), " ".join(str(m.get("content", "")).split()))
+            for m in messages
+        ]
+        if isinstance(stop, str):
+            stop = [stop]
+        payload = json.dumps(
+            [model, temperature, sorted(stop or []), normalized],
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.stats.incr("misses")
+                return None
+            self._conn.execute(
+                "UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        self.stats.incr("hits")
+        return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM completions ORDER BY accessed_at"
+        ).fetchall():
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self.stats.incr("evictions")
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+
+class CachedLLM(LLM):
+    """crewai LLM that answers repeated prompts from a CompletionCache."""
+
+    def __init__(self, *args, cache: Optional[CompletionCache] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        # Native function calling runs tools inside the call; never skip those.
+        if self.cache is None or tools or available_functions:
+            return self._complete(messages, tools, callbacks, available_functions)
+
+        key = self.cache.make_key(self.model, self.temperature, messages, self.stop)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if self.cache.offline:
+            raise CompletionCacheMiss(f"No cached completion for {self.model} (key {key[:12]})")
+
+        response = self._complete(messages, tools, callbacks, available_functions)
+        if response:
+            self.cache.put(key, self.model, response)
+        return response
+
+    def _complete(self, messages, tools=None, callbacks=None, available_functions=None) -> str:
+        with span("llm.call", model=self.model):
+            return super().call(messages, tools, callbacks, available_functions)
@@ -1,129 +1,219 @@
-import os
-import tweepy
+import logging
+from typing import Optional
 from crewai import Crew, Task
 from dotenv import load_dotenv
-from tavily import TavilyClient
 from studia_agent.tools import TwitterTools
-from studia_agent.researcher import TokenAnalyzer
+from studia_agent.researcher import TokenAnalyzer, TokenReport
 from studia_agent.agents import create_twitter_agents
+from studia_agent.clients import get_twitter_client, get_tavily_client, get_token_service, get_prompt_budgeter
+from studia_agent.outbox import TweetOutbox
+from studia_agent.services.dedup_index import DuplicateIndex
+from studia_agent.tweet_text import TweetCheck, TweetRules, prepare_tweet, truncate_tweet, weighted_length
+from studia_agent.journal import RunJournal, SNAPSHOT, ANALYSIS, DRAFT, POST, ERROR
+from studia_agent.services.token_snapshot import TokenSnapshot
+from studia_agent.instrumentation import kickoff, span
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from .env
 load_dotenv()
 
-# Twitter API credentials from .env
-TWITTER_API_KEY = os.getenv("TWITTER_API_KEY", "")
-TWITTER_API_SECRET = os.getenv("TWITTER_API_SECRET", "")
-TWITTER_ACCESS_TOKEN = os.getenv("TWITTER_ACCESS_TOKEN", "")
-TWITTER_ACCESS_TOKEN_SECRET = os.getenv("TWITTER_ACCESS_TOKEN_SECRET", "")
-TWITTER_BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN", "")
+def finalize_tweet(draft: str, tweet_publisher, rules: TweetRules) -> TweetCheck:
+    """
+    Turn a draft into a publishable tweet.
 
-# Add Tavily API key
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
+    The draft is normalized and validated locally. Only when it still breaks a
+    rule (in practice: too long) is the Content Quality Manager asked for a
+    rewrite; as a last resort the text is truncated at a word boundary.
+    """
+    check = prepare_tweet(draft, rules)
+    if check.ok:
+        return check
 
-# Initialize Twitter client only if credentials are provided
-twitter_client = None
-if all([TWITTER_API_KEY, TWITTER_API_SECRET, TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_TOKEN_SECRET]):
-    try:
-        print("\nInitializing Twitter client...")
-        print(f"API Key present: {bool(TWITTER_API_KEY)}")
-        print(f"API Secret present: {bool(TWITTER_API_SECRET)}")
-        print(f"Access Token present: {bool(TWITTER_ACCESS_TOKEN)}")
-        print(f"Access Token Secret present: {bool(TWITTER_ACCESS_TOKEN_SECRET)}")
-        
-        # Initialize Twitter client with v2 API
-        client = tweepy.Client(
-            consumer_key=TWITTER_API_KEY,
-            consumer_secret=TWITTER_API_SECRET,
-            access_token=TWITTER_ACCESS_TOKEN,
-            access_token_secret=TWITTER_ACCESS_TOKEN_SECRET,
-            bearer_token=TWITTER_BEARER_TOKEN,
-            wait_on_rate_limit=True
-        )
-        
-        # Test if client is properly authenticated
-        test_response = client.get_me()
-        if test_response.data:
-            print(f"Successfully authenticated as: @{test_response.data.username}")
-            twitter_client = client
-        else:
-            print("Failed to authenticate with Twitter")
-    except Exception as e:
-        print(f"Error initializing Twitter client: {str(e)}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response status: {e.response.status_code}")
-            print(f"Response text: {e.response.text}")
-
-# Initialize Tavily client
-tavily_client = None
-if TAVILY_API_KEY:
+    rewrite_task = Task(
+        description=f"""Rewrite this tweet so it fixes these problems: {'; '.join(check.problems)}.
+        It must stay under {rules.max_length} characters as counted by Twitter (links count as 23,
+        emoji and CJK characters as 2), must not be wrapped in quotes, must not use hashtags and
+        may use at most {rules.max_emoji} emoji. Keep the key message.
+        Tweet: {check.text}""",
+        expected_output="Only the rewritten tweet text.",
+        agent=tweet_publisher
+    )
+    rewritten = kickoff(Crew(agents=[tweet_publisher], tasks=[rewrite_task], verbose=True), "tweet_rewrite")
+    check = prepare_tweet(str(rewritten), rules)
+    if not check.ok:
+        check = prepare_tweet(truncate_tweet(check.text, rules), rules)
+    return check
+
+def analysis_digest(analysis_result, analyzer: TokenAnalyzer, token_address: str) -> str:
+    """The facts an analysis is based on: the rounded token snapshot, else the analysis text."""
+    snapshot = getattr(analysis_result, "snapshot", None) or analyzer.token_service.get_token_snapshot(token_address)
+    return snapshot.digest() if snapshot is not None else str(analysis_result)
+
+def _analysis_record(analysis_result) -> dict:
+    if isinstance(analysis_result, TokenReport):
+        return {"research": analysis_result.research, "market": analysis_result.market,
+                "risk": analysis_result.risk, "text": str(analysis_result)}
+    tasks = getattr(analysis_result, "tasks_output", None) or []
+    return {"tasks": [str(task) for task in tasks], "text": str(analysis_result)}
+
+def _analysis_from_record(token_address: str, snapshot: Optional[TokenSnapshot], record: dict):
+    if "research" in record:
+        return TokenReport(token_address, snapshot, record["research"], record["market"], record["risk"])
+    return record["text"]
+
+def analyze_and_tweet_token(token_address: str, twitter_client=None, tavily_client=None, analyzer: Optional[TokenAnalyzer] = None, parallel: bool = False,
+                            outbox: Optional[TweetOutbox] = None, dedup: Optional[DuplicateIndex] = None,
+                            journal: Optional[RunJournal] = None, run_id: Optional[str] = None, resume: bool = False):
+    """
+    Analyze a token, write a tweet about it and post (or queue) it.
+
+    With a ``journal``, each finished stage is recorded under a run ID. A
+    given ``run_id`` (or, with ``resume``, the token's latest unfinished
+    run) continues after its last finished stage instead of starting over;
+    otherwise a new run starts on fresh data. A finished run is never
+    posted again; its recorded analysis and draft are returned.
+    """
+    run = journal.start(token_address, run_id, resume=resume) if journal is not None else None
+    if run is not None and run.finished:
+        # Never post a finished run again; hand back what it recorded
+        print(f"Run {run.run_id} already finished: {run.get(POST)}")
+        snapshot = TokenSnapshot.from_dict(run.get(SNAPSHOT)) if run.get(SNAPSHOT) is not None else None
+        analysis = run.get(ANALYSIS)
+        draft = run.get(DRAFT)
+        return (_analysis_from_record(token_address, snapshot, analysis) if analysis is not None else None,
+                draft["raw"] if draft is not None else None)
+    if run is not None and run.last_stage:
+        print(f"Resuming run {run.run_id} after stage '{run.last_stage}'")
+    stage = SNAPSHOT
     try:
-        print("\nInitializing Tavily client...")
-        tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
-        print("Successfully initialized Tavily client")
+        with span("pipeline.analyze_and_tweet", token=token_address, run=run.run_id if run else None):
+            # Clients are created on first use and shared across calls; with an outbox
+            # the tweet is only queued, so no Twitter client is needed here
+            if twitter_client is None and outbox is None:
+                twitter_client = get_twitter_client()
+            if tavily_client is None:
+                tavily_client = get_tavily_client()
+            analyzer = analyzer or TokenAnalyzer(get_token_service())
+
+            snapshot = None
+            if run is not None:
+                if run.get(SNAPSHOT) is not None:
+                    snapshot = TokenSnapshot.from_dict(run.get(SNAPSHOT))
+                else:
+                    snapshot = analyzer.token_service.get_token_snapshot(token_address)
+                    if snapshot is not None:
+                        run.record(SNAPSHOT, snapshot.to_dict())
+
+            # First, analyze the token
+            stage = ANALYSIS
+            if run is not None and run.get(ANALYSIS) is not None:
+                analysis_result = _analysis_from_record(token_address, snapshot, run.get(ANALYSIS))
+            else:
+                analysis_result = analyzer.analyze_token(token_address, parallel=parallel)
+                if run is not None:
+                    run.record(ANALYSIS, _analysis_record(analysis_result))
+            logger.debug("Token analysis results for %s:\n%s", token_address, analysis_result)
+
+            # Create a tweet about the analysis
+            stage = DRAFT
+            twitter_tools = TwitterTools(twitter_client, outbox=outbox, dedup=dedup,
+                                         run_id=run.run_id if run is not None else None,
+                                         token_address=token_address)
+            draft = run.get(DRAFT) if run is not None else None
+            digest = None
+            if dedup is not None:
+                digest = snapshot.digest() if snapshot is not None else analysis_digest(analysis_result, analyzer, token_address)
+            if draft is not None:
+                tweet_result, tweet_content = draft["raw"], draft["text"]
+            else:
+                # Skip the writer when the facts match what was already tweeted for this token
+                if digest is not None:
+                    # Digests are already rounded, so any changed field must count as news
+                    match = dedup.find_exact(digest, "digest", token_address)
+                    if match is not None:
+                        reason = "token facts unchanged since an earlier tweet"
+                        print(f"Skipping tweet: {reason}")
+                        if run is not None:
+                            run.record(POST, {"skipped": reason})
+                        return analysis_result, None
+
+                content_researcher, content_writer, tweet_publisher = create_twitter_agents(twitter_client, tavily_client)
+                # The writer only needs the key facts; the full report mostly adds latency and cost
+                analysis_data = get_prompt_budgeter().fit(str(analysis_result), "tweet_draft.analysis")
+
+                prefix = twitter_tools.rules.prefix
+                prefix_rule = f"Start with exactly one {prefix} prefix" if prefix else "Start directly with the text, no prefix or quote"
+
+                # Create specific task for token tweet
+                token_tweet_task = Task(
+                    description=f"""Based on this token analysis, create an informative tweet about the token {token_address}.
+            Include key metrics like price, market cap, and any significant findings.
+            The tweet MUST:
+            1. {prefix_rule}
+            2. Be under 280 characters TOTAL
+            3. Not be wrapped in quotes
+            4. Not use hashtags
+            5. Use at most one emoji if appropriate
+            Analysis data: {analysis_data}""",
+                    expected_output="""A single tweet string that summarizes the token analysis, 
+            formatted according to the requirements and under 280 characters.""",
+                    agent=content_writer
+                )
+
+                # Create crew for tweet creation
+                crew = Crew(
+                    agents=[content_writer],
+                    tasks=[token_tweet_task],
+                    verbose=True
+                )
+
+                tweet_result = kickoff(crew, "tweet_draft", token=token_address)
+
+                # Clean up locally; only ask the publisher to rewrite if that is not enough
+                check = finalize_tweet(str(tweet_result), tweet_publisher, twitter_tools.rules)
+                tweet_content = check.text
+                if run is not None:
+                    run.record(DRAFT, {"raw": str(tweet_result), "text": tweet_content,
+                                       "weighted_length": check.weighted_length})
+
+            stage = POST
+            print("\nAttempting to post tweet...")
+            print(f"Tweet content: {tweet_content}")
+            print(f"Tweet length: {weighted_length(tweet_content)} weighted characters")
+
+            with span("tweet.post", queued=outbox is not None):
+                post_result = twitter_tools.post_tweet(tweet_content)
+            print(f"Tweet Result: {post_result}")
+            # Only a real post or an enqueue counts; previews and failures must not block later tweets
+            posted = post_result.startswith(("Tweet posted", "Tweet queued"))
+            if digest is not None and posted:
+                dedup.add(digest, "digest", token_address)
+            if run is not None:
+                # A failed post leaves the run open, so a rerun only retries posting.
+                if post_result.startswith("Error"):
+                    run.record(ERROR, {"stage": POST, "error": post_result})
+                else:
+                    run.record(POST, {"result": post_result})
     except Exception as e:
-        print(f"Error initializing Tavily client: {str(e)}")
-
-def analyze_and_tweet_token(token_address: str):
-    # First, analyze the token
-    analyzer = TokenAnalyzer()
-    analysis_result = analyzer.analyze_token(token_address)
-    print("\nToken Analysis Results:")
-    print(analysis_result)
-
-    # Create a tweet about the analysis
-    twitter_tools = TwitterTools(twitter_client)
-    content_researcher, content_writer, tweet_publisher = create_twitter_agents(twitter_client)
-    
-    # Create specific task for token tweet
-    token_tweet_task = Task(
-        description=f"""Based on this token analysis, create an informative tweet about the token {token_address}.
-        Include key metrics like price, market cap, and any significant findings.
-        The tweet MUST:
-        1. Start with exactly one ' prefix
-        2. Be under 280 characters TOTAL
-        3. Not be wrapped in quotes
-        4. Not use hashtags
-        5. Use at most one emoji if appropriate
-        Analysis data: {analysis_result}""",
-        expected_output="""A single tweet string that summarizes the token analysis, 
-        formatted according to the requirements and under 280 characters.""",
-        agent=content_writer
-    )
+        if run is not None:
+            run.record(ERROR, {"stage": stage, "error": f"{type(e).__name__}: {e}"})
+        raise
 
-    # Create crew for tweet creation
-    crew = Crew(
-        agents=[content_writer, tweet_publisher],
-        tasks=[token_tweet_task],
-        verbose=True
-    )
-    
-    tweet_result = crew.kickoff()
-    
-    # Clean up and post the tweet
-    tweet_content = str(tweet_result).strip()
-    if tweet_content.startswith("'") and tweet_content.endswith("'"):
-        tweet_content = tweet_content[1:-1].strip()
-    
-    print("\nAttempting to post tweet...")
-    print(f"Tweet content: {tweet_content}")
-    print(f"Tweet length: {len(tweet_content)} characters")
-    
-    post_result = twitter_tools.post_tweet(tweet_content)
-    print(f"Tweet Result: {post_result}")
-    
     return analysis_result, tweet_result
 
 if __name__ == "__main__":
     # Studia token address
     STUDIA_TOKEN_ADDRESS = "2bz1pAVAWHk1qqtLx7oB5oy1PVQiQvtsqgaBbcqQpump"
     
+    twitter_client = get_twitter_client()
     if twitter_client is None:
         print("Twitter client not initialized. Please check your credentials.")
     else:
         print(f"\nAnalyzing and tweeting about Studia token: {STUDIA_TOKEN_ADDRESS}")
-        analysis_result, tweet_result = analyze_and_tweet_token(STUDIA_TOKEN_ADDRESS)
+        analysis_result, tweet_result = analyze_and_tweet_token(STUDIA_TOKEN_ADDRESS, twitter_client)
         print(f"\nAnalysis complete. Tweet result: {tweet_result}")
 
     # Example token address (replace with actual token address)
     token_address = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC on Solana
-    analysis_result, tweet_result = analyze_and_tweet_token(token_address)
+    analysis_result, tweet_result = analyze_and_tweet_token(token_address, twitter_client)
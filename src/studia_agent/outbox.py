@@ -0,0 +1,346 @@
+import os
+import time
+import random
+import logging
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Tuple
+import requests
+import tweepy
+
+PENDING = "pending"
+SENDING = "sending"
+POSTED = "posted"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxItem:
+    key: str
+    content: str
+    status: str
+    attempts: int
+    verify: bool
+    tweet_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TweetOutbox:
+    """
+    Durable queue of tweets waiting to be published, stored in SQLite.
+
+    Every tweet has an idempotency key (by default a hash of its text and of
+    the run that wrote it), so enqueueing the same tweet twice never posts it
+    twice. Items move from
+    pending to sending to posted or failed.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("STUDIA_OUTBOX_DB", "tweet_outbox.sqlite")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS outbox (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                verify INTEGER NOT NULL DEFAULT 0,
+                tweet_id TEXT,
+                error TEXT,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content: str, scope: Optional[str] = None) -> str:
+        text = " ".join(content.split())
+        if scope:
+            text = f"{scope}\n{text}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+    def enqueue(self, content: str, key: Optional[str] = None, scope: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Queue ``content`` and return its idempotency key and whether it was
+        newly queued (False if that key was already queued or posted).
+
+        ``scope`` (e.g. a run ID) limits the default key to one run, so a
+        later run tweeting the same text is queued again.
+        """
+        key = key or self.make_key(content, scope)
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, content, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, content, PENDING, now, now, now),
+            )
+            self._conn.commit()
+        return key, cursor.rowcount > 0
+
+    def status(self, key: str) -> Optional[OutboxItem]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, content, status, attempts, verify, tweet_id, error FROM outbox WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return self._item(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return dict(rows)
+
+    def claim_next(self) -> Optional[OutboxItem]:
+        """Atomically move the oldest due pending item to sending."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, content, status, attempts, verify, tweet_id, error FROM outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY created_at LIMIT 1",
+                (PENDING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ? WHERE key = ?",
+                (SENDING, now, row[0]),
+            )
+            self._conn.commit()
+        item = self._item(row)
+        item.status, item.attempts = SENDING, item.attempts + 1
+        return item
+
+    def mark_posted(self, key: str, tweet_id: Optional[str], note: Optional[str] = None):
+        self._update(key, status=POSTED, tweet_id=tweet_id, error=note)
+
+    def mark_failed(self, key: str, error: str):
+        self._update(key, status=FAILED, error=error)
+
+    def retry_later(self, key: str, error: str, at: float, verify: bool = False, count_attempt: bool = True):
+        """Put ``key`` back to pending until ``at``.
+
+        ``verify`` marks attempts whose outcome is unknown (e.g. a timeout or
+        5xx after the request was sent), so the next attempt first checks
+        whether the tweet went out.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, error = ?, next_attempt_at = ?, verify = MAX(verify, ?), "
+                "attempts = attempts - ?, updated_at = ? WHERE key = ?",
+                (PENDING, error, at, int(verify), 0 if count_attempt else 1, time.time(), key),
+            )
+            self._conn.commit()
+
+    def recover_interrupted(self) -> int:
+        """Requeue items left in sending by a crashed publisher, flagged for verification."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, verify = 1, updated_at = ? WHERE status = ?",
+                (PENDING, time.time(), SENDING),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def _update(self, key: str, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE outbox SET {assignments} WHERE key = ?", (*fields.values(), key)
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _item(row) -> OutboxItem:
+        key, content, status, attempts, verify, tweet_id, error = row
+        return OutboxItem(key, content, status, attempts, bool(verify), tweet_id, error)
+
+
+class RateLimitWindow:
+    """Tracks Twitter's rate-limit window from response headers."""
+
+    # Per-app/user 15 minute window and the 24 hour user cap on posting.
+    HEADERS = (
+        ("x-rate-limit-remaining", "x-rate-limit-reset"),
+        ("x-user-limit-24hour-remaining", "x-user-limit-24hour-reset"),
+    )
+
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.blocked_until: float = 0.0
+
+    def update(self, headers: Mapping[str, str]):
+        seen = []
+        for remaining_header, reset_header in self.HEADERS:
+            if remaining_header not in headers:
+                continue
+            try:
+                remaining = int(headers[remaining_header])
+                reset_at = float(headers.get(reset_header) or 0) or None
+            except (TypeError, ValueError):
+                continue  # malformed header; keep the last known window
+            seen.append(remaining)
+            if remaining == 0:
+                self.exhausted(reset_at)
+        if seen:
+            self.remaining = min(seen)
+
+    def exhausted(self, reset_at: Optional[float] = None):
+        self.remaining = 0
+        self.blocked_until = max(self.blocked_until, reset_at or time.time() + 60)
+
+    def wait_time(self) -> float:
+        return max(0.0, self.blocked_until - time.time())
+
+
+class OutboxPublisher:
+    """
+    Drains a TweetOutbox in a background thread.
+
+    Posting never blocks analysis workers: when the rate-limit window is
+    exhausted the publisher sleeps until the reset time reported by Twitter
+    and resumes. Transient errors are retried with jittered backoff up to
+    ``max_attempts``; an item whose previous attempt had an unknown outcome is
+    checked against the account's recent tweets before being sent again.
+    """
+
+    def __init__(
+        self,
+        outbox: TweetOutbox,
+        twitter_client: tweepy.Client,
+        poll_interval: float = 2.0,
+        max_attempts: int = 5,
+        on_status: Optional[Callable[[OutboxItem], None]] = None,
+    ):
+        self.outbox = outbox
+        self.twitter_client = twitter_client
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.on_status = on_status
+        self.window = RateLimitWindow()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._user_id: Optional[str] = None
+
+    def start(self) -> "OutboxPublisher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="tweet-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        self.outbox.recover_interrupted()
+        while not self._stop.is_set():
+            if not self.publish_pending():
+                self._stop.wait(self.poll_interval)
+
+    def publish_pending(self) -> int:
+        """Publish due items until none are left or the window is exhausted."""
+        published = 0
+        while not self._stop.is_set():
+            delay = self.window.wait_time()
+            if delay > 0:
+                logger.warning("Tweet outbox: rate limit reached, resuming in %.0fs", delay)
+                self._stop.wait(delay)
+                continue
+            item = self.outbox.claim_next()
+            if item is None:
+                break
+            try:
+                self._publish(item)
+            except Exception as e:
+                # Never let one item stop the drain; its outcome is unknown, so verify first.
+                logger.exception("Tweet outbox: error publishing %s", item.key)
+                self._retry(item, f"{type(e).__name__}: {str(e)}", verify=True)
+            published += 1
+        return published
+
+    def _publish(self, item: OutboxItem):
+        if item.verify:
+            try:
+                tweet_id = self._find_posted(item.content)
+            except Exception as e:
+                # Never re-send while the earlier outcome is unknown.
+                self._retry(item, f"could not verify earlier attempt: {str(e)}", verify=True)
+                return self._report(item.key)
+            if tweet_id:
+                self.outbox.mark_posted(item.key, tweet_id, note="confirmed after interrupted attempt")
+                return self._report(item.key)
+
+        try:
+            response = self.twitter_client.request(
+                "POST", "/2/tweets", json={"text": item.content}, user_auth=True
+            )
+            self.window.update(response.headers)
+            self.outbox.mark_posted(item.key, response.json()["data"]["id"])
+        except tweepy.TooManyRequests as e:
+            self.window.update(e.response.headers)
+            self.window.exhausted(self._reset_time(e.response.headers))
+            # Rejected before posting: not an attempt and no verification needed.
+            self.outbox.retry_later(item.key, "rate limited", self.window.blocked_until, count_attempt=False)
+        except tweepy.Forbidden as e:
+            if "duplicate" in str(e).lower():
+                self.outbox.mark_posted(item.key, None, note="duplicate content already posted")
+            else:
+                self.outbox.mark_failed(item.key, str(e))
+        except (tweepy.TwitterServerError, requests.RequestException) as e:
+            self._retry(item, str(e), verify=True)
+        except tweepy.HTTPException as e:
+            self.outbox.mark_failed(item.key, str(e))
+        except Exception as e:
+            # E.g. an unexpected response body after the POST went through:
+            # the outcome is unknown, so verify before sending again.
+            self._retry(item, f"{type(e).__name__}: {str(e)}", verify=True)
+        self._report(item.key)
+
+    @staticmethod
+    def _reset_time(headers: Mapping[str, str]) -> Optional[float]:
+        try:
+            return float(headers.get("x-rate-limit-reset") or 0) or None
+        except (TypeError, ValueError):
+            return None
+
+    def _retry(self, item: OutboxItem, error: str, verify: bool):
+        if item.attempts >= self.max_attempts:
+            self.outbox.mark_failed(item.key, error)
+            return
+        delay = random.uniform(0, min(300.0, 2.0 * 2 ** item.attempts))
+        self.outbox.retry_later(item.key, error, time.time() + delay, verify=verify)
+
+    def _find_posted(self, content: str) -> Optional[str]:
+        if self._user_id is None:
+            self._user_id = self.twitter_client.get_me(user_auth=True).data.id
+        response = self.twitter_client.get_users_tweets(self._user_id, max_results=20, user_auth=True)
+        wanted = " ".join(content.split())
+        for tweet in response.data or []:
+            if " ".join(tweet.text.split()) == wanted:
+                return str(tweet.id)
+        return None
+
+    def _report(self, key: str):
+        item = self.outbox.status(key)
+        if item is None:
+            return
+        logger.log(logging.WARNING if item.status == FAILED else logging.INFO, "Tweet outbox: %s %s%s",
+                   item.key, item.status, f" ({item.error})" if item.error else "")
+        if self.on_status is not None:
+            self.on_status(item)
@@ -0,0 +1,164 @@
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from .services.token_snapshot import TokenSnapshot
+
+FEATURES = (
+    "liquidity_usd",
+    "market_cap_usd",
+    "volume_usd",
+    "txns",
+    "change_1h",
+    "change_24h",
+    "risk_score",
+    "mint_authority",
+    "freeze_authority",
+    "rugged",
+    "socials",
+)
+# Heavy-tailed dollar and count features are scored on a log10 scale.
+LOG_FEATURES = {"liquidity_usd", "market_cap_usd", "volume_usd", "txns"}
+
+
+def feature_matrix(snapshots: Sequence[TokenSnapshot]) -> np.ndarray:
+    """Return an ``(n, len(FEATURES))`` float matrix; missing values are NaN."""
+    rows = []
+    for snapshot in snapshots:
+        row = []
+        for name in FEATURES:
+            value = len(snapshot.socials) if name == "socials" else getattr(snapshot, name)
+            row.append(np.nan if value is None else float(value))
+        rows.append(row)
+    return np.asarray(rows, dtype=float).reshape(len(rows), len(FEATURES))
+
+
+@dataclass
+class ScoringRules:
+    """
+    Hard filters and feature weights for :class:`PreScorer`.
+
+    A token failing any filter is rejected regardless of its score. The score
+    is the weighted sum of the features, with dollar amounts and transaction
+    counts taken as log10(1 + x) and missing values contributing nothing.
+    """
+
+    min_liquidity_usd: float = 1_000.0
+    min_market_cap_usd: float = 0.0
+    max_risk_score: float = 8.0
+    reject_rugged: bool = True
+    reject_mint_authority: bool = True
+    reject_freeze_authority: bool = False
+    weights: Dict[str, float] = field(default_factory=lambda: {
+        "liquidity_usd": 1.0,
+        "market_cap_usd": 0.5,
+        "volume_usd": 0.5,
+        "txns": 0.25,
+        "change_1h": 0.01,
+        "change_24h": 0.02,
+        "risk_score": -0.5,
+        "freeze_authority": -1.0,
+        "socials": 0.25,
+    })
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScoringRules":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown scoring rule(s): {', '.join(sorted(unknown))}")
+        rules = cls(**{key: value for key, value in data.items() if key != "weights"})
+        rules.weights.update(data.get("weights") or {})
+        bad = set(rules.weights) - set(FEATURES)
+        if bad:
+            raise ValueError(f"Unknown feature weight(s): {', '.join(sorted(bad))}")
+        return rules
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScoringRules":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+@dataclass
+class ScoredToken:
+    address: str
+    score: float
+    passed: bool
+    rejected_by: Tuple[str, ...] = ()
+    snapshot: Optional[TokenSnapshot] = None
+
+    def describe(self) -> str:
+        status = "ok" if self.passed else "rejected: " + ", ".join(self.rejected_by)
+        return f"{self.address} score={self.score:.2f} ({status})"
+
+
+class PreScorer:
+    """
+    Ranks many tokens in one vectorized pass before any LLM is involved.
+
+    Filters and the weighted score are evaluated over the whole feature
+    matrix at once, so screening thousands of payloads takes milliseconds;
+    only the selected tokens go on to the analysis crews.
+    """
+
+    def __init__(self, rules: Optional[ScoringRules] = None):
+        self.rules = rules or ScoringRules()
+
+    def filters(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Return a boolean rejection mask per filter name."""
+        col = {name: X[:, i] for i, name in enumerate(FEATURES)}
+        rules = self.rules
+        # NaN comparisons are False, so missing liquidity fails the minimum.
+        masks = {
+            "liquidity": ~(col["liquidity_usd"] >= rules.min_liquidity_usd),
+            "risk_score": col["risk_score"] > rules.max_risk_score,
+        }
+        if rules.min_market_cap_usd > 0:
+            masks["market_cap"] = ~(col["market_cap_usd"] >= rules.min_market_cap_usd)
+        if rules.reject_rugged:
+            masks["rugged"] = col["rugged"] == 1
+        if rules.reject_mint_authority:
+            masks["mint_authority"] = col["mint_authority"] == 1
+        if rules.reject_freeze_authority:
+            masks["freeze_authority"] = col["freeze_authority"] == 1
+        return masks
+
+    def scores(self, X: np.ndarray) -> np.ndarray:
+        weights = np.array([self.rules.weights.get(name, 0.0) for name in FEATURES])
+        log_columns = np.array([name in LOG_FEATURES for name in FEATURES])
+        values = X.copy()
+        values[:, log_columns] = np.log10(1 + np.clip(values[:, log_columns], 0, None))
+        return np.nan_to_num(values, nan=0.0) @ weights
+
+    def score(self, snapshots: Sequence[TokenSnapshot]) -> List[ScoredToken]:
+        """Score ``snapshots`` and return them best first, passing tokens before rejected ones."""
+        if not snapshots:
+            return []
+        X = feature_matrix(snapshots)
+        scores = self.scores(X)
+        masks = self.filters(X)
+        rejected = np.zeros(len(snapshots), dtype=bool)
+        for mask in masks.values():
+            rejected |= mask
+        order = np.lexsort((-scores, rejected))
+
+        results = []
+        for i in order:
+            reasons = tuple(name for name, mask in masks.items() if mask[i])
+            results.append(ScoredToken(snapshots[i].address, float(scores[i]), not rejected[i], reasons, snapshots[i]))
+        return results
+
+    def select(self, snapshots: Sequence[TokenSnapshot], top_n: Optional[int] = None,
+               min_score: Optional[float] = None) -> List[ScoredToken]:
+        """Passing tokens with ``score >= min_score``, best first, at most ``top_n``."""
+        selected = [
+            token for token in self.score(snapshots)
+            if token.passed and (min_score is None or token.score >= min_score)
+        ]
+        return selected[:top_n] if top_n is not None else selected
+
+
+def snapshots_from_payloads(payloads: Iterable[Tuple[str, Optional[Dict[str, Any]]]]) -> List[TokenSnapshot]:
+    """Convert ``(address, payload)`` pairs, e.g. from ``get_token_infos``, skipping missing ones."""
+    return [TokenSnapshot.from_payload(address, data) for address, data in payloads if data]
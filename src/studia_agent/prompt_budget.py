@@ -0,0 +1,220 @@
+import os
+import re
+import logging
+import functools
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from .instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+# Default budgets in tokens, looked up by full name, then by the part before
+# the first dot ("tool.WebSearch" -> "tool").
+BUDGETS = {
+    "tweet_draft": 600,
+    "tool": 500,
+    "tool.MultiWebSearch": 900,
+}
+DEFAULT_BUDGET = 1500
+
+KEYWORDS = (
+    "price", "market cap", "liquidity", "volume", "risk", "rug", "mint", "freeze",
+    "holder", "buy", "sell", "change", "trend", "volatility", "drawdown", "score",
+)
+_HEADER_RE = re.compile(r"^\s*(#{1,6}\s|[A-Z][\w ]{0,40}:$|Search results for:|Token Analysis Report:)")
+_SENTENCE_RE = re.compile(r"(?<=[^\d\s][.!?])\s+(?=[\"'(*\-•\dA-Z])")
+_EMPTY_RE = re.compile(r"(=|:\s)(n/a|none)\b", re.IGNORECASE)
+
+_encodings: Dict[str, Optional[object]] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model: str):
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # tiktoken missing, or its BPE file cannot be downloaded
+                logger.warning("No tokenizer for %s (%s); estimating token counts", model, e)
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Token count of ``text`` for ``model``; about four characters per token without tiktoken."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return max(1, (len(text) + 3) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass
+class Compaction:
+    """Result of fitting one prompt input into its budget."""
+
+    name: str
+    text: str
+    budget: int
+    original_tokens: int
+    tokens: int
+
+    @property
+    def saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+    @property
+    def compacted(self) -> bool:
+        return self.tokens < self.original_tokens
+
+
+class PromptBudgeter:
+    """
+    Keeps text embedded in prompts (upstream analyses, tool outputs) within a
+    token budget per name.
+
+    Text over budget is compacted extractively: it is split into headers,
+    lines and sentences, headers are always kept, and the remaining units are
+    ranked by how much they say (numbers, market and risk terms, first
+    sentence of a section) while lines without a value ("n/a", "none") are
+    pruned first. The best units that fit are kept in their original order,
+    and verbatim repeats are dropped.
+    Saved tokens are counted in ``studia_prompt_tokens_saved_total``.
+
+    STUDIA_PROMPT_BUDGETS overrides budgets, e.g. ``tweet_draft=400,tool=300``;
+    a budget of 0 disables compaction for that name.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, default: int = DEFAULT_BUDGET,
+                 model: str = "gpt-4"):
+        self.budgets = dict(BUDGETS if budgets is None else budgets)
+        self.default = default
+        self.model = model
+
+    @classmethod
+    def from_env(cls) -> "PromptBudgeter":
+        budgets = dict(BUDGETS)
+        default = DEFAULT_BUDGET
+        for item in filter(None, (part.strip() for part in os.getenv("STUDIA_PROMPT_BUDGETS", "").split(","))):
+            name, _, value = item.partition("=")
+            if name.strip() == "default":
+                default = int(value)
+            else:
+                budgets[name.strip()] = int(value)
+        return cls(budgets, default, model=os.getenv("STUDIA_MODEL") or "gpt-4")
+
+    def budget(self, name: str) -> int:
+        if name in self.budgets:
+            return self.budgets[name]
+        return self.budgets.get(name.split(".", 1)[0], self.default)
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def fit(self, text: str, name: str, budget: Optional[int] = None) -> str:
+        """Return ``text``, compacted if it exceeds the budget for ``name``."""
+        return self.compact(text, name, budget).text
+
+    def compact(self, text: str, name: str, budget: Optional[int] = None) -> Compaction:
+        text = str(text)
+        budget = self.budget(name) if budget is None else budget
+        original = self.count(text)
+        if budget <= 0 or original <= budget:
+            return Compaction(name, text, budget, original, original)
+
+        compacted = self._extract(text, budget)
+        result = Compaction(name, compacted, budget, original, self.count(compacted))
+        metrics.incr("studia_prompt_compactions_total", prompt=name)
+        metrics.incr("studia_prompt_tokens_saved_total", result.saved, prompt=name)
+        logger.info("Compacted %s from %d to %d tokens (budget %d)", name, original, result.tokens, budget)
+        return result
+
+    def _extract(self, text: str, budget: int) -> str:
+        units = self._units(text)
+        costs = [self.count(unit_text) + 1 for _, unit_text, _ in units]  # +1 for the joining whitespace
+        keep = [score is None for _, _, score in units]
+        used = sum(cost for cost, kept in zip(costs, keep) if kept)
+
+        ranked = sorted(
+            (i for i, (_, _, score) in enumerate(units) if score is not None),
+            key=lambda i: (-units[i][2] / costs[i] ** 0.5, i),
+        )
+        for i in ranked:
+            if used + costs[i] <= budget:
+                keep[i] = True
+                used += costs[i]
+
+        lines: Dict[int, List[str]] = {}
+        for (line, unit_text, _), kept in zip(units, keep):
+            if kept:
+                lines.setdefault(line, []).append(unit_text)
+        compacted = "\n".join(" ".join(parts) for _, parts in sorted(lines.items()))
+        if self.count(compacted) > budget:
+            compacted = self._truncate(compacted, budget)
+        return compacted
+
+    def _units(self, text: str) -> List[Tuple[int, str, Optional[float]]]:
+        """(line number, text, score) per header, line or sentence; headers score None (always kept).
+
+        Sentences repeated verbatim (analysts often restate the same figures)
+        are dropped.
+        """
+        units = []
+        seen = set()
+        section_start = True
+        for line_no, line in enumerate(text.splitlines()):
+            line = line.strip()
+            if not line:
+                continue
+            if _HEADER_RE.match(line):
+                units.append((line_no, line, None))
+                section_start = True
+                continue
+            for sentence in _SENTENCE_RE.split(line):
+                key = " ".join(sentence.lower().split())
+                if key in seen:
+                    continue
+                seen.add(key)
+                units.append((line_no, sentence, self._score(sentence, section_start)))
+                section_start = False
+        return units
+
+    @staticmethod
+    def _score(sentence: str, section_start: bool) -> float:
+        lowered = sentence.lower()
+        score = 1.0
+        if re.search(r"\d", sentence):
+            score += 2
+        score += min(3, sum(keyword in lowered for keyword in KEYWORDS))
+        if section_start:
+            score += 1
+        if _EMPTY_RE.search(sentence):
+            score -= 2
+        return max(score, 0.1)
+
+    def _truncate(self, text: str, budget: int) -> str:
+        encoding = _encoding(self.model)
+        if encoding is None:
+            return text[: max(0, budget * 4 - 3)].rstrip() + "..."
+        return encoding.decode(encoding.encode(text, disallowed_special=())[: max(0, budget - 1)]).rstrip() + "..."
+
+
+def budgeted(name: str, budgeter: Optional[PromptBudgeter] = None) -> Callable:
+    """Decorator fitting a tool's string output into the budget for ``name``."""
+
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            from .clients import get_prompt_budgeter
+            return (budgeter or get_prompt_budgeter()).fit(fn(*args, **kwargs), name)
+
+        return wrapper
+
+    return decorate
@@ -1,22 +1,183 @@
-from typing import List
+import time
+import logging
+import contextvars
+from typing import Any, Iterable, Iterator, List, Optional
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from crewai import Crew
 from .services.token_service import TokenService
+from .services.token_snapshot import TokenSnapshot
+from .services.timeseries import TimeSeriesStore
+from .services.indicators import Indicators, compute_indicators
 from .agents import create_token_analysis_agents, create_token_tasks
+from .prescore import PreScorer, ScoredToken, snapshots_from_payloads
+from .instrumentation import kickoff, span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TokenReport:
+    """Merged output of the research, market and risk analysts."""
+
+    token_address: str
+    snapshot: Optional[TokenSnapshot]
+    research: str
+    market: str
+    risk: str
+
+    def __str__(self):
+        return "\n\n".join([
+            f"Token Analysis Report: {self.token_address}",
+            f"## Token Research\n{self.research}",
+            f"## Market Analysis\n{self.market}",
+            f"## Risk Assessment\n{self.risk}",
+        ])
+
+@dataclass
+class BatchResult:
+    """Outcome of one token in :meth:`TokenAnalyzer.analyze_many`."""
+
+    token_address: str
+    result: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 class TokenAnalyzer:
-    def __init__(self):
-        self.token_service = TokenService()
-
-    def analyze_token(self, token_address: str):
-        # Create specialized agents
-        token_researcher, market_analyst, risk_analyst = create_token_analysis_agents(self.token_service)
-        
-        # Create crew for token analysis
-        crew = Crew(
-            agents=[token_researcher, market_analyst, risk_analyst],
-            tasks=create_token_tasks(token_address, token_researcher, market_analyst, risk_analyst),
-            verbose=True
-        )
-        
-        result = crew.kickoff()
-        return result 
\ No newline at end of file
+    def __init__(self, token_service: Optional[TokenService] = None, history: Optional[TimeSeriesStore] = None,
+                 history_window: float = 7 * 24 * 3600, record_history: bool = True):
+        self.token_service = token_service or TokenService()
+        # When set, every analyzed snapshot is recorded and indicators over
+        # the last ``history_window`` seconds are given to the analysts.
+        # ``record_history=False`` only reads the store, for callers (like the
+        # watchlist monitor) that already record every snapshot themselves.
+        self.history = history
+        self.history_window = history_window
+        self.record_history = record_history
+
+    def indicators(self, token_address: str, snapshot: Optional[TokenSnapshot] = None) -> Optional[Indicators]:
+        """Record ``snapshot`` in the history store (unless disabled) and compute indicators from it."""
+        if self.history is None:
+            return None
+        if self.record_history:
+            if snapshot is None:
+                snapshot = self.token_service.get_token_snapshot(token_address)
+            if snapshot is not None:
+                self.history.append(snapshot)
+        return compute_indicators(self.history.load(token_address, since=time.time() - self.history_window))
+
+    def analyze_token(self, token_address: str, parallel: bool = False):
+        if parallel:
+            return self.analyze_token_parallel(token_address)
+
+        with span("pipeline.analyze", token=token_address):
+            # Create specialized agents
+            token_researcher, market_analyst, risk_analyst = create_token_analysis_agents(self.token_service)
+            indicators = self.indicators(token_address)
+
+            # Create crew for token analysis
+            crew = Crew(
+                agents=[token_researcher, market_analyst, risk_analyst],
+                tasks=create_token_tasks(token_address, token_researcher, market_analyst, risk_analyst,
+                                         indicators=indicators),
+                verbose=True
+            )
+
+            return kickoff(crew, "token_analysis", token=token_address)
+
+    def analyze_token_parallel(self, token_address: str) -> TokenReport:
+        """
+        Run the research, market and risk analysts concurrently.
+
+        The three tasks only read token data, so the snapshot is fetched once
+        up front and embedded in each task, and every analyst runs in its own
+        single-task crew. Wall-clock time is roughly that of the slowest task.
+        """
+        with span("pipeline.analyze_parallel", token=token_address):
+            snapshot = self.token_service.get_token_snapshot(token_address)
+            agents = create_token_analysis_agents(self.token_service)
+            tasks = create_token_tasks(token_address, *agents, snapshot=snapshot,
+                                       indicators=self.indicators(token_address, snapshot))
+
+            with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="token-analyst") as pool:
+                futures = [
+                    pool.submit(
+                        contextvars.copy_context().run, kickoff,
+                        Crew(agents=[task.agent], tasks=[task], verbose=True), name, token=token_address,
+                    )
+                    for task, name in zip(tasks, ("research", "market", "risk"))
+                ]
+                research, market, risk = [str(future.result()) for future in futures]
+
+        return TokenReport(token_address, snapshot, research, market, risk)
+
+    def screen(
+        self,
+        addresses: Iterable[str],
+        scorer: Optional[PreScorer] = None,
+        top_n: Optional[int] = None,
+        min_score: Optional[float] = None,
+    ) -> List[ScoredToken]:
+        """
+        Fetch all ``addresses`` in bulk and return the ones worth a full
+        analysis, best first. No LLM is called; pass the addresses of the
+        result to :meth:`analyze_many`.
+        """
+        scorer = scorer or PreScorer()
+        with span("pipeline.screen") as screen_span:
+            snapshots = snapshots_from_payloads(self.token_service.get_token_infos(addresses))
+            selected = scorer.select(snapshots, top_n=top_n, min_score=min_score)
+            screen_span.set(tokens=len(snapshots), selected=len(selected))
+        return selected
+
+    def analyze_many(
+        self,
+        addresses: Iterable[str],
+        concurrency: int = 4,
+        parallel: bool = False,
+    ) -> Iterator[BatchResult]:
+        """
+        Analyze many tokens on a bounded worker pool.
+
+        Results are yielded as each token finishes, in completion order. All
+        workers share this analyzer's TokenService, so its connection pool and
+        cache are reused across the batch. A failing token yields a
+        BatchResult with ``error`` set instead of stopping the batch.
+
+        Args:
+            addresses: Token addresses; may be a lazy iterable.
+            concurrency: Maximum number of tokens analyzed at the same time.
+            parallel: Use :meth:`analyze_token_parallel` for each token.
+        """
+        addresses = iter(addresses)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="token-batch") as pool:
+            running = {}
+
+            def submit_next() -> bool:
+                address = next(addresses, None)
+                if address is None:
+                    return False
+                running[pool.submit(self._analyze_one, address, parallel)] = address
+                return True
+
+            while len(running) < concurrency and submit_next():
+                pass
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    yield future.result()
+                    submit_next()
+
+    def _analyze_one(self, token_address: str, parallel: bool) -> BatchResult:
+        started = time.perf_counter()
+        try:
+            result = self.analyze_token(token_address, parallel=parallel)
+            return BatchResult(token_address, result=result, elapsed=time.perf_counter() - started)
+        except Exception as e:
+            logger.exception("Error analyzing token %s", token_address)
+            return BatchResult(token_address, error=e, elapsed=time.perf_counter() - started)
@@ -0,0 +1,210 @@
+import os
+import json
+import logging
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Any, Callable, Dict, List, Optional
+import litellm
+from crewai import LLM
+from .llm_cache import CachedLLM, CompletionCache
+from .instrumentation import metrics, span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Route:
+    """Model settings for one agent role.
+
+    ``latency_budget`` caps the time the primary model gets for a call (for
+    streaming calls: until the first chunk arrives, as the timeout applies to
+    every read). When it runs out the call is repeated on ``fallback_model``
+    with the full ``timeout``. Without a fallback model the budget is
+    ignored.
+    """
+
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None
+    latency_budget: Optional[float] = None
+    fallback_model: Optional[str] = None
+    stream: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Route":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown route setting(s): {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def merged(self, other: "Route") -> "Route":
+        """Return this route with every setting ``other`` defines taken from it."""
+        updates = {key: value for key, value in asdict(other).items() if value is not None}
+        return replace(self, **updates)
+
+
+class RoutingConfig:
+    """
+    Maps agent roles to :class:`Route` settings.
+
+    Config file (JSON), pointed to by STUDIA_ROUTING::
+
+        {
+          "default": {"model": "gpt-4", "timeout": 120},
+          "roles": {
+            "Content Quality Manager": {"model": "gpt-4o-mini", "max_tokens": 200},
+            "Market Intelligence Specialist": {"latency_budget": 30, "fallback_model": "gpt-4o-mini"}
+          }
+        }
+
+    Settings resolve as: the role's entry, then ``default``, then the model
+    and temperature the agent was written with. STUDIA_MODEL and
+    STUDIA_FALLBACK_MODEL override the default model and fallback model.
+    """
+
+    def __init__(self, default: Optional[Route] = None, roles: Optional[Dict[str, Route]] = None):
+        self.default = default or Route()
+        self.roles = dict(roles or {})
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RoutingConfig":
+        unknown = set(data) - {"default", "roles"}
+        if unknown:
+            raise ValueError(f"Unknown routing section(s): {', '.join(sorted(unknown))}")
+        return cls(
+            Route.from_dict(data.get("default") or {}),
+            {role: Route.from_dict(route) for role, route in (data.get("roles") or {}).items()},
+        )
+
+    @classmethod
+    def from_env(cls) -> "RoutingConfig":
+        path = os.getenv("STUDIA_ROUTING")
+        config = cls()
+        if path:
+            with open(path) as f:
+                config = cls.from_dict(json.load(f))
+        overrides = Route(model=os.getenv("STUDIA_MODEL") or None,
+                          fallback_model=os.getenv("STUDIA_FALLBACK_MODEL") or None)
+        config.default = config.default.merged(overrides)
+        return config
+
+    def route(self, role: str, model: str = "gpt-4", temperature: float = 0.7) -> Route:
+        """Resolve the route of ``role``; ``model``/``temperature`` are the agent's own defaults."""
+        route = Route(model=model, temperature=temperature).merged(self.default)
+        if role in self.roles:
+            route = route.merged(self.roles[role])
+        return route
+
+
+class RoutedLLM(CachedLLM):
+    """
+    CachedLLM that applies a Route: latency budget with model fallback and
+    optional streaming. ``on_token`` receives streamed text as it arrives.
+    """
+
+    def __init__(self, route: Route, cache: Optional[CompletionCache] = None,
+                 on_token: Optional[Callable[[str], None]] = None):
+        has_fallback = bool(route.fallback_model and route.fallback_model != route.model)
+        # Without a fallback model the budget has nothing to fall back to; use the plain timeout.
+        budget = route.latency_budget if has_fallback else None
+        timeout = min(budget, route.timeout) if budget and route.timeout else (budget or route.timeout)
+        super().__init__(
+            model=route.model,
+            temperature=route.temperature,
+            max_tokens=route.max_tokens,
+            timeout=timeout,
+            cache=cache,
+        )
+        self.route = route
+        self.on_token = on_token
+        self.fallback: Optional[LLM] = None
+        if has_fallback:
+            self.fallback = LLM(
+                model=route.fallback_model,
+                temperature=route.temperature,
+                max_tokens=route.max_tokens,
+                timeout=route.timeout,
+            )
+
+    def _complete(self, messages, tools=None, callbacks=None, available_functions=None) -> str:
+        native_tools = bool(tools or available_functions)
+        if not self.route.stream and self.fallback is None:
+            # Nothing to add to crewai's own call
+            return super()._complete(messages, tools, callbacks, available_functions)
+        try:
+            if native_tools:
+                # crewai runs native function calls inside LLM.call
+                return super()._complete(messages, tools, callbacks, available_functions)
+            with span("llm.call", model=self.model, stream=bool(self.route.stream)):
+                # A budgeted call is not retried; the fallback takes over instead.
+                return self._request(self, messages, callbacks,
+                                     retry=self.fallback is None or not self.route.latency_budget)
+        except litellm.Timeout:
+            if self.fallback is None:
+                raise
+            logger.warning("%s exceeded its latency budget, falling back to %s", self.model, self.fallback.model)
+            metrics.incr("studia_llm_fallbacks_total", model=self.model, fallback=self.fallback.model)
+            # The agent executor sets stop words on the primary LLM only.
+            self.fallback.stop = self.stop
+            with span("llm.call", model=self.fallback.model, fallback=True):
+                if native_tools:
+                    return self.fallback.call(messages, tools, callbacks, available_functions)
+                return self._request(self.fallback, messages, callbacks)
+
+    def _request(self, llm: LLM, messages, callbacks: Optional[List[Any]] = None, retry: bool = True) -> str:
+        """Text completion on ``llm`` with the parameters LLM.call sends, plus streaming and retry control."""
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        if callbacks:
+            llm.set_callbacks(callbacks)
+        stream = bool(self.route.stream)
+        params = {
+            "model": llm.model,
+            "messages": messages,
+            "timeout": llm.timeout,
+            "temperature": llm.temperature,
+            "top_p": llm.top_p,
+            "n": llm.n,
+            "stop": llm.stop,
+            "max_tokens": llm.max_tokens or llm.max_completion_tokens,
+            "presence_penalty": llm.presence_penalty,
+            "frequency_penalty": llm.frequency_penalty,
+            "logit_bias": llm.logit_bias,
+            "response_format": llm.response_format,
+            "seed": llm.seed,
+            "logprobs": llm.logprobs,
+            "top_logprobs": llm.top_logprobs,
+            "api_base": llm.base_url,
+            "api_version": llm.api_version,
+            "api_key": llm.api_key,
+            "stream": stream,
+            "stream_options": {"include_usage": True} if stream else None,
+            "max_retries": None if retry else 0,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+
+        response = litellm.completion(**params)
+        if stream:
+            parts, usage = [], None
+            for chunk in response:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    if self.on_token is not None:
+                        self.on_token(text)
+            text = "".join(parts)
+        else:
+            usage = getattr(response, "usage", None)
+            text = response.choices[0].message.content or ""
+
+        # Same usage hand-off as crewai's LLM.call, so token counters stay right.
+        if usage is not None:
+            for callback in callbacks or []:
+                if hasattr(callback, "log_success_event"):
+                    callback.log_success_event(kwargs=params, response_obj={"usage": usage},
+                                               start_time=0, end_time=0)
+        return text
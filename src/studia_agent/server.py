@@ -0,0 +1,271 @@
+import json
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from .researcher import TokenAnalyzer, TokenReport
+from .services.cache import ResponseCache, MemoryCache, FRESH
+from .instrumentation import metrics, register_cache, span
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class ServiceBusy(Exception):
+    """Raised when the worker pool and its queue are full."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too many analyses in progress")
+        self.retry_after = retry_after
+
+
+class ServiceClosed(Exception):
+    """Raised for new work once the service is shutting down."""
+
+
+class AnalysisService:
+    """
+    Runs token analyses (and optionally the tweet pipeline) for many callers.
+
+    - At most ``workers`` runs execute at once, and at most ``queue_size``
+      more wait; beyond that :meth:`request` raises ServiceBusy.
+    - Concurrent requests for the same token (and mode) share one run: the
+      first starts it and later ones wait on the same future. Unlike
+      SingleFlight, the run lives on the pool rather than in the caller's
+      thread, so a caller that gives up waiting does not cancel it for others.
+    - Results are cached for ``ttl`` seconds, so requests arriving just after
+      a run finishes get its result too.
+    """
+
+    def __init__(
+        self,
+        analyzer: Optional[TokenAnalyzer] = None,
+        workers: int = 4,
+        queue_size: int = 16,
+        ttl: float = 300.0,
+        parallel: bool = False,
+        outbox=None,
+        dedup=None,
+        journal=None,
+    ):
+        self.analyzer = analyzer or TokenAnalyzer()
+        self.workers = workers
+        self.queue_size = queue_size
+        self.parallel = parallel
+        self.outbox = outbox
+        self.dedup = dedup
+        self.journal = journal
+        self.cache = ResponseCache(MemoryCache(maxsize=512), ttl=ttl, stale_ttl=0)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-service")
+        self._lock = threading.Lock()
+        self._running: Dict[Tuple[str, str], Future] = {}
+        self._closed = False
+        self._runs = 0
+        self._run_seconds = 0.0
+        register_cache("analysis", self.cache.stats)
+        metrics.register_collector("service.analysis", self._collect)
+
+    def _collect(self):
+        with self._lock:
+            pending = len(self._running)
+        yield "studia_service_pending", {}, pending
+        yield "studia_service_capacity", {}, self.workers + self.queue_size
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            running = sorted(address for _, address in self._running)
+        return {
+            "status": "closing" if self._closed else "ok",
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": len(running),
+            "tokens": running,
+        }
+
+    def request(self, token_address: str, tweet: bool = False, refresh: bool = False,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Return the result for ``token_address``, running the pipeline if no
+        fresh result is cached. Raises ServiceBusy, ServiceClosed, or
+        concurrent.futures.TimeoutError when ``timeout`` passes first (the run
+        continues and its result is cached).
+        """
+        mode = "tweet" if tweet else "analyze"
+        key = (mode, token_address)
+        cache_key = f"{mode}:{token_address}"
+        if not refresh:
+            value, state = self.cache.lookup(cache_key)
+            if state == FRESH:
+                metrics.incr("studia_service_results_total", mode=mode, source="cache")
+                return dict(value, cached=True, coalesced=False)
+
+        with self._lock:
+            if self._closed:
+                raise ServiceClosed("Service is shutting down")
+            future = self._running.get(key)
+            coalesced = future is not None
+            if future is None:
+                if len(self._running) >= self.workers + self.queue_size:
+                    metrics.incr("studia_service_rejected_total", mode=mode)
+                    raise ServiceBusy(retry_after=self._retry_after())
+                context = contextvars.copy_context()
+                future = self._pool.submit(context.run, self._run, mode, token_address, cache_key)
+                self._running[key] = future
+
+        if not coalesced:
+            # Outside the lock: the callback runs right away if the run already finished.
+            future.add_done_callback(lambda _, key=key: self._finished(key))
+
+        metrics.incr("studia_service_results_total", mode=mode, source="coalesced" if coalesced else "run")
+        return dict(future.result(timeout), cached=False, coalesced=coalesced)
+
+    def _finished(self, key: Tuple[str, str]):
+        with self._lock:
+            self._running.pop(key, None)
+
+    def _retry_after(self) -> float:
+        # Roughly when a worker frees up: the average run time so far.
+        if not self._runs:
+            return 30.0
+        return max(1.0, self._run_seconds / self._runs)
+
+    def _run(self, mode: str, token_address: str, cache_key: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with span("service.run", mode=mode, token=token_address):
+            if mode == "tweet":
+                from .main import analyze_and_tweet_token
+                analysis, tweet = analyze_and_tweet_token(
+                    token_address, analyzer=self.analyzer, parallel=self.parallel,
+                    outbox=self.outbox, dedup=self.dedup, journal=self.journal,
+                )
+            else:
+                analysis, tweet = self.analyzer.analyze_token(token_address, parallel=self.parallel), None
+
+        result = {
+            "token_address": token_address,
+            "analysis": str(analysis),
+            "tweet": None if tweet is None else str(tweet),
+            "elapsed": round(time.perf_counter() - started, 3),
+            "completed_at": time.time(),
+        }
+        with self._lock:
+            self._runs += 1
+            self._run_seconds += result["elapsed"]
+        if isinstance(analysis, TokenReport):
+            result["sections"] = {"research": analysis.research, "market": analysis.market, "risk": analysis.risk}
+        self.cache.store(cache_key, result)
+        return result
+
+    def close(self, wait: bool = True):
+        """Refuse new work and let the queued runs finish."""
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=wait)
+
+
+def make_handler(service: AnalysisService, request_timeout: Optional[float] = None):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "studia-agent"
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/healthz":
+                status = service.status()
+                self._json(503 if status["status"] == "closing" else 200, status)
+            elif path == "/metrics":
+                self._send(200, metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4")
+            else:
+                self._json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            path = self.path.split("?", 1)[0]
+            if path not in ("/analyze", "/tweet"):
+                self._json(404, {"error": "Not found"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_BYTES:
+                self._json(413, {"error": "Request body too large"})
+                return
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+                token_address = str(body["token_address"]).strip()
+                timeout = body.get("timeout", request_timeout)
+                timeout = None if timeout is None else float(timeout)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self._json(400, {"error": "Expected a JSON object with token_address (and a numeric timeout)"})
+                return
+            if not token_address:
+                self._json(400, {"error": "token_address is empty"})
+                return
+
+            try:
+                result = service.request(
+                    token_address,
+                    tweet=path == "/tweet",
+                    refresh=bool(body.get("refresh")),
+                    timeout=timeout,
+                )
+            except ServiceBusy as e:
+                self._json(429, {"error": str(e)}, {"Retry-After": str(int(e.retry_after))})
+            except ServiceClosed as e:
+                self._json(503, {"error": str(e)})
+            except FutureTimeout:
+                self._json(504, {"error": "Analysis still running; retry to get the cached result"})
+            except Exception as e:
+                logger.exception("Analysis of %s failed", token_address)
+                self._json(500, {"error": f"{type(e).__name__}: {e}"})
+            else:
+                self._json(200, result)
+
+        def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+            self._send(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+            path = self.path.split("?", 1)[0]
+            metrics.incr("studia_service_requests_total", path=path, status=status)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return Handler
+
+
+def make_server(service: AnalysisService, host: str = "127.0.0.1", port: int = 8080,
+                request_timeout: Optional[float] = None) -> ThreadingHTTPServer:
+    """
+    HTTP/JSON API over ``service``:
+
+    - ``POST /analyze`` ``{"token_address": ..., "refresh": false, "timeout": null}``
+    - ``POST /tweet``: same body, runs the analyze-and-tweet pipeline
+    - ``GET /healthz`` and ``GET /metrics`` (Prometheus text)
+
+    Full queue: 429 with Retry-After; shutting down: 503; wait timeout: 504.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(service, request_timeout))
+    server.daemon_threads = True
+    return server
+
+
+def serve(service: AnalysisService, host: str = "127.0.0.1", port: int = 8080,
+          request_timeout: Optional[float] = None):
+    """Serve until interrupted, then let running analyses finish."""
+    server = make_server(service, host, port, request_timeout)
+    print(f"Serving token analyses on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
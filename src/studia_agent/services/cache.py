@@ -0,0 +1,249 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for a cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "refreshes": self.refreshes,
+            }
+
+
+class CacheBackend:
+    """Storage interface used by ResponseCache.
+
+    Backends only store ``(value, stored_at)`` pairs; freshness is decided by
+    the ResponseCache policy so the same backend works for any TTL.
+    """
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, stored_at: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-memory LRU backend bounded by number of entries."""
+
+    def __init__(self, maxsize: int = 1024, stats: Optional[CacheStats] = None):
+        self.maxsize = maxsize
+        self.stats = stats
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data.move_to_end(key)
+            return item
+
+    def set(self, key: str, value: Any, stored_at: float):
+        with self._lock:
+            self._data[key] = (value, stored_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                if self.stats is not None:
+                    self.stats.incr("evictions")
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk backend that survives restarts and can be shared by processes.
+
+    Values must be JSON serialisable. The least recently used rows are evicted
+    once ``max_entries`` is exceeded.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, stats: Optional[CacheStats] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = stats
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, stored_at: float):
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, stored_at, time.time()),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                if self.stats is not None:
+                    self.stats.incr("evictions", overflow)
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """TTL cache with stale-while-revalidate on top of a pluggable backend.
+
+    An entry younger than ``ttl`` is fresh. Between ``ttl`` and
+    ``ttl + stale_ttl`` it is stale: the cached value is returned immediately
+    and a single background refresh is started. Older entries are misses.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: float = 30.0,
+        stale_ttl: float = 120.0,
+    ):
+        self.stats = CacheStats()
+        if backend is None:
+            backend = MemoryCache()
+        if getattr(backend, "stats", False) is None:
+            backend.stats = self.stats
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+
+    def lookup(self, key: str) -> Tuple[Any, str]:
+        """Return ``(value, state)`` where state is fresh, stale or miss."""
+        item = self.backend.get(key)
+        if item is None:
+            self.stats.incr("misses")
+            return None, MISS
+        value, stored_at = item
+        age = time.time() - stored_at
+        if age < self.ttl:
+            self.stats.incr("hits")
+            return value, FRESH
+        if age < self.ttl + self.stale_ttl:
+            self.stats.incr("stale_hits")
+            return value, STALE
+        self.stats.incr("misses")
+        return None, MISS
+
+    def store(self, key: str, value: Any):
+        if value is None:
+            return
+        self.backend.set(key, value, time.time())
+
+    def invalidate(self, key: str):
+        self.backend.delete(key)
+
+    def begin_refresh(self, key: str) -> bool:
+        """Claim the background refresh for ``key``; False if one is running."""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+        self.stats.incr("refreshes")
+        return True
+
+    def end_refresh(self, key: str):
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        value, state = self.lookup(key)
+        if state == FRESH:
+            return value
+        if state == STALE:
+            if self.begin_refresh(key):
+                threading.Thread(
+                    target=self._refresh, args=(key, fetch), daemon=True
+                ).start()
+            return value
+        value = fetch()
+        self.store(key, value)
+        return value
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]):
+        try:
+            self.store(key, fetch())
+        finally:
+            self.end_refresh(key)
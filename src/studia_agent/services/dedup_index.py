@@ -0,0 +1,125 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+
+BITS = 64
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_WORD_RE = re.compile(r"[\w$%.+-]+")
+
+
+def _tokens(text: str) -> List[str]:
+    words = _WORD_RE.findall(_URL_RE.sub(" ", text.lower()))
+    words = [word.strip(".") for word in words if word.strip(".")]
+    # Word bigrams keep some order; single words cover very short texts.
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of ``text`` over lower-cased words and word bigrams, URLs ignored."""
+    tokens = _tokens(text)
+    if not tokens:
+        return 0
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little") for token in tokens],
+        dtype=np.uint64,
+    )
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(tokens)
+    return int(np.packbits(votes > 0, bitorder="little").view("<u8")[0])
+
+
+def _signed(fingerprint: int) -> int:
+    # SQLite integers are signed 64-bit.
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def hamming(a: np.ndarray, b: int) -> np.ndarray:
+    """Bit distance between each fingerprint in ``a`` and ``b``."""
+    diff = np.bitwise_xor(a.astype(np.uint64), np.uint64(b))
+    return np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+@dataclass
+class DuplicateMatch:
+    text: str
+    similarity: float
+    created_at: float
+
+
+class DuplicateIndex:
+    """
+    SQLite index of SimHash fingerprints of past tweets and analysis digests.
+
+    Two texts are near-duplicates when the share of equal fingerprint bits is
+    at least ``threshold`` (0.85 allows 9 of 64 bits to differ, about one
+    changed word in a tweet). Only entries younger than ``window`` seconds
+    and of the same ``kind`` and ``scope`` (e.g. a token address) are
+    compared. SimHash is meant for prose such as tweets; short structured
+    texts where one changed field matters should use :meth:`find_exact`.
+    """
+
+    def __init__(self, path: Optional[str] = None, threshold: Optional[float] = None,
+                 window: Optional[float] = None):
+        self.path = path or os.getenv("STUDIA_DEDUP_DB", "tweet_dedup.sqlite")
+        self.threshold = threshold if threshold is not None else float(os.getenv("STUDIA_DEDUP_THRESHOLD", "0.85"))
+        self.window = window if window is not None else float(os.getenv("STUDIA_DEDUP_WINDOW_HOURS", "72")) * 3600
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS fingerprints (
+                kind TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                fingerprint INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS fingerprints_scope ON fingerprints (kind, scope, created_at)"
+        )
+        self._conn.commit()
+
+    def find(self, text: str, kind: str = "tweet", scope: str = "") -> Optional[DuplicateMatch]:
+        """Return the most similar recent entry if it is a near-duplicate of ``text``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT fingerprint, text, created_at FROM fingerprints "
+                "WHERE kind = ? AND scope = ? AND created_at >= ?",
+                (kind, scope, time.time() - self.window),
+            ).fetchall()
+        if not rows:
+            return None
+        fingerprints = np.array([row[0] for row in rows], dtype=np.int64).view(np.uint64)
+        distances = hamming(fingerprints, simhash(text))
+        best = int(np.argmin(distances))
+        similarity = 1 - int(distances[best]) / BITS
+        if similarity < self.threshold:
+            return None
+        return DuplicateMatch(rows[best][1], similarity, rows[best][2])
+
+    def find_exact(self, text: str, kind: str = "tweet", scope: str = "") -> Optional[DuplicateMatch]:
+        """Return a recent entry whose text equals ``text``; for short structured texts like digests."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, created_at FROM fingerprints "
+                "WHERE kind = ? AND scope = ? AND text = ? AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (kind, scope, text, time.time() - self.window),
+            ).fetchone()
+        return None if row is None else DuplicateMatch(row[0], 1.0, row[1])
+
+    def add(self, text: str, kind: str = "tweet", scope: str = ""):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO fingerprints (kind, scope, fingerprint, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, scope, _signed(simhash(text)), text, time.time()),
+            )
+            self._conn.execute("DELETE FROM fingerprints WHERE created_at < ?", (time.time() - self.window,))
+            self._conn.commit()
@@ -0,0 +1,127 @@
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+import numpy as np
+
+HOUR = 3600.0
+
+
+def _last(values: np.ndarray) -> Optional[float]:
+    valid = values[~np.isnan(values)]
+    return float(valid[-1]) if valid.size else None
+
+
+def _fmt(value: Optional[float], spec: str = ".4g", suffix: str = "") -> str:
+    return "n/a" if value is None else f"{value:{spec}}{suffix}"
+
+
+@dataclass(slots=True)
+class Indicators:
+    """Numbers derived from a token's snapshot history for the analysis tasks."""
+
+    points: int
+    hours: float
+    return_pct: Optional[float] = None
+    volatility_pct: Optional[float] = None
+    trend_pct_per_hour: Optional[float] = None
+    vwap_usd: Optional[float] = None
+    price_vs_vwap_pct: Optional[float] = None
+    max_drawdown_pct: Optional[float] = None
+    liquidity_change_pct: Optional[float] = None
+    liquidity_drawdown_pct: Optional[float] = None
+    risk_first: Optional[float] = None
+    risk_last: Optional[float] = None
+    risk_max: Optional[float] = None
+    risk_trend_per_day: Optional[float] = None
+    rugged_seen: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def render_market(self) -> str:
+        return "\n".join([
+            f"history: {self.points} snapshots over {self.hours:.1f}h",
+            f"price: return={_fmt(self.return_pct, '+.2f', '%')} volatility={_fmt(self.volatility_pct, '.2f', '%')} "
+            f"trend={_fmt(self.trend_pct_per_hour, '+.2f', '%/h')} max_drawdown={_fmt(self.max_drawdown_pct, '.2f', '%')}",
+            f"vwap: vwap_usd={_fmt(self.vwap_usd, '.6g')} price_vs_vwap={_fmt(self.price_vs_vwap_pct, '+.2f', '%')}",
+            f"liquidity: change={_fmt(self.liquidity_change_pct, '+.2f', '%')} drawdown_from_peak={_fmt(self.liquidity_drawdown_pct, '.2f', '%')}",
+        ])
+
+    def render_risk(self) -> str:
+        return "\n".join([
+            f"history: {self.points} snapshots over {self.hours:.1f}h",
+            f"risk_trajectory: first={_fmt(self.risk_first, '.3g')} last={_fmt(self.risk_last, '.3g')} "
+            f"max={_fmt(self.risk_max, '.3g')} trend={_fmt(self.risk_trend_per_day, '+.2f', '/day')} "
+            f"rugged_seen={'yes' if self.rugged_seen else 'no'}",
+            f"liquidity: change={_fmt(self.liquidity_change_pct, '+.2f', '%')} drawdown_from_peak={_fmt(self.liquidity_drawdown_pct, '.2f', '%')}",
+        ])
+
+
+def _slope(t: np.ndarray, y: np.ndarray) -> Optional[float]:
+    """Least-squares slope of ``y`` over ``t``, ignoring NaNs."""
+    mask = ~np.isnan(y)
+    if mask.sum() < 2:
+        return None
+    t, y = t[mask], y[mask]
+    t = t - t.mean()
+    denom = float(np.dot(t, t))
+    return float(np.dot(t, y - y.mean()) / denom) if denom > 0 else None
+
+
+def compute_indicators(series: Dict[str, np.ndarray]) -> Optional[Indicators]:
+    """
+    Compute indicators from the columns returned by TimeSeriesStore.load.
+
+    - volatility: standard deviation of log returns between snapshots
+    - trend: log-linear price slope, as percent per hour
+    - vwap: price weighted by the volume traded between snapshots (the
+      increase of the reported volume; equal weights when it never grows)
+    - drawdowns: distance of the lowest point (price) and the last point
+      (liquidity) below the running peak
+    - risk trajectory: first/last/max risk score and its slope per day
+
+    Returns None when there are fewer than two snapshots.
+    """
+    ts = np.asarray(series["ts"], dtype=float)
+    if ts.size < 2:
+        return None
+    price = np.asarray(series["price_usd"], dtype=float)
+    liquidity = np.asarray(series["liquidity_usd"], dtype=float)
+    volume = np.asarray(series["volume_usd"], dtype=float)
+    risk = np.asarray(series["risk_score"], dtype=float)
+    rugged = np.asarray(series["rugged"], dtype=float)
+    result = Indicators(points=int(ts.size), hours=float(ts[-1] - ts[0]) / HOUR)
+
+    valid = ~np.isnan(price) & (price > 0)
+    if valid.sum() >= 2:
+        p, t = price[valid], ts[valid]
+        log_p = np.log(p)
+        returns = np.diff(log_p)
+        result.return_pct = float(np.expm1(log_p[-1] - log_p[0]) * 100)
+        result.volatility_pct = float(np.std(returns) * 100)
+        slope = _slope(t / HOUR, log_p)
+        result.trend_pct_per_hour = float(np.expm1(slope) * 100) if slope is not None else None
+        result.max_drawdown_pct = float(np.max(1 - p / np.maximum.accumulate(p)) * 100)
+
+        v = volume[valid]
+        weights = np.clip(np.diff(v, prepend=v[0]), 0, None)
+        weights = np.nan_to_num(weights)
+        if weights.sum() <= 0:
+            weights = np.ones_like(p)
+        result.vwap_usd = float(np.average(p, weights=weights))
+        result.price_vs_vwap_pct = float((p[-1] / result.vwap_usd - 1) * 100)
+
+    liq = liquidity[~np.isnan(liquidity)]
+    if liq.size >= 2 and liq[0] > 0:
+        peak = np.maximum.accumulate(liq)
+        result.liquidity_change_pct = float((liq[-1] / liq[0] - 1) * 100)
+        result.liquidity_drawdown_pct = float((1 - liq[-1] / peak[-1]) * 100) if peak[-1] > 0 else None
+
+    risk_valid = risk[~np.isnan(risk)]
+    if risk_valid.size:
+        result.risk_first = float(risk_valid[0])
+        result.risk_last = _last(risk)
+        result.risk_max = float(risk_valid.max())
+        slope = _slope(ts / (24 * HOUR), risk)
+        result.risk_trend_per_day = slope
+    result.rugged_seen = bool(np.nansum(rugged) > 0)
+    return result
@@ -0,0 +1,228 @@
+import os
+import re
+import json
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from .cache import ResponseCache, MemoryCache
+from .singleflight import SingleFlight
+from ..instrumentation import register_cache
+
+logger = logging.getLogger(__name__)
+
+
+class SearchService:
+    """
+    Tavily web search shared by all agents.
+
+    Keeps one client, caches responses per normalized query for ``ttl``
+    seconds, collapses concurrent identical queries into a single request and
+    renders results as a compact, size-capped digest for prompts. Several
+    queries can be run at once with :meth:`search_many`; their merged digest
+    lists up to ``merged_top_k`` results in at most ``merged_max_chars``
+    characters.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        cache: Optional[ResponseCache] = None,
+        ttl: float = 900.0,
+        top_k: int = 5,
+        snippet_chars: int = 280,
+        max_chars: int = 1500,
+        max_queries: int = 5,
+        max_workers: int = 4,
+        merged_top_k: int = 10,
+        merged_max_chars: int = 3000,
+    ):
+        self._client = client
+        self._client_lock = threading.Lock()
+        self.cache = cache if cache is not None else ResponseCache(MemoryCache(maxsize=512), ttl=ttl, stale_ttl=0)
+        self.top_k = top_k
+        self.snippet_chars = snippet_chars
+        self.max_chars = max_chars
+        self.max_queries = max_queries
+        self.max_workers = max_workers
+        self.merged_top_k = merged_top_k
+        self.merged_max_chars = merged_max_chars
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._flight = SingleFlight()
+        register_cache("search", self.cache.stats)
+
+    @property
+    def client(self):
+        with self._client_lock:
+            if self._client is None and os.getenv("TAVILY_API_KEY"):
+                from tavily import TavilyClient
+                self._client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+            return self._client
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(str(query).strip().strip('"\'').lower().split())
+
+    def search(self, query: str) -> Dict[str, Any]:
+        """Return the raw Tavily response for ``query``, cached and deduplicated.
+
+        The normalized query is only the cache key; Tavily gets the query as written.
+        """
+        key = self.normalize_query(query)
+        return self.cache.get_or_fetch(
+            key, lambda: self._flight.do(key, lambda: self._fetch(str(query).strip()))
+        )
+
+    def search_digest(self, query: str) -> str:
+        """Search and return a top-k title/url/snippet digest for prompts."""
+        try:
+            return self.render_digest(query, self.search(query))
+        except Exception as e:
+            return f"Error searching: {str(e)}"
+
+    @staticmethod
+    def parse_queries(text: Any) -> List[str]:
+        """Split tool input into queries: a JSON list, or one query per line, ';' or '|'."""
+        if isinstance(text, (list, tuple)):
+            items = list(text)
+        else:
+            text = str(text).strip()
+            items = None
+            if text.startswith("["):
+                try:
+                    items = json.loads(text)
+                except ValueError:
+                    pass
+            if not isinstance(items, list):
+                items = re.split(r"[\n;|]+", text)
+        queries, seen = [], set()
+        for item in items:
+            query = str(item).strip().strip('"\'')
+            if query and SearchService.normalize_query(query) not in seen:
+                seen.add(SearchService.normalize_query(query))
+                queries.append(query)
+        return queries
+
+    def search_many(self, queries: Sequence[str]) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Run up to ``max_queries`` searches concurrently on a pool of
+        ``max_workers`` threads (further queries are skipped). Returns
+        ``(query, response, error)`` per query, in input order; one failing
+        query does not fail the others.
+        """
+        queries = list(queries)
+        if len(queries) > self.max_queries:
+            logger.warning("Searching only the first %d of %d queries", self.max_queries, len(queries))
+            queries = queries[: self.max_queries]
+        with self._client_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="search")
+        futures = [self._pool.submit(contextvars.copy_context().run, self.search, query) for query in queries]
+        results = []
+        for query, future in zip(queries, futures):
+            try:
+                results.append((query, future.result(), None))
+            except Exception as e:
+                results.append((query, None, e))
+        return results
+
+    def search_many_digest(self, text: Any) -> str:
+        """Search several queries at once and return one merged, ranked digest."""
+        queries = self.parse_queries(text)
+        if not queries:
+            return "Error searching: no queries given"
+        results = self.search_many(queries)
+        if all(error is not None for _, _, error in results):
+            return f"Error searching: {str(results[0][2])}"
+        return self.render_merged_digest(results, skipped=queries[self.max_queries:])
+
+    @staticmethod
+    def canonical_url(url: str) -> str:
+        """URL with scheme/host lower-cased and fragment, trailing slash and tracking parameters removed."""
+        parts = urlsplit(str(url).strip())
+        query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith("utm_")])
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower().removeprefix("www."),
+                           parts.path.rstrip("/"), query, ""))
+
+    def merge_results(self, results: Sequence[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]) -> List[Dict[str, Any]]:
+        """
+        Merge results of several queries, one entry per canonical URL,
+        ranked by the number of queries that found it, then by best score
+        and earliest rank.
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for query_index, (query, response, _) in enumerate(results):
+            for rank, result in enumerate((response or {}).get("results") or []):
+                url = result.get("url") or ""
+                key = self.canonical_url(url) if url else f"{query_index}:{rank}"
+                entry = merged.get(key)
+                if entry is None:
+                    entry = merged[key] = {
+                        "title": result.get("title"), "url": url, "content": result.get("content") or "",
+                        "score": 0.0, "rank": rank, "queries": [],
+                    }
+                entry["score"] = max(entry["score"], float(result.get("score") or 0.0))
+                entry["rank"] = min(entry["rank"], rank)
+                if query not in entry["queries"]:
+                    entry["queries"].append(query)
+                if len(result.get("content") or "") > len(entry["content"]):
+                    entry["content"] = result["content"]
+        return sorted(merged.values(), key=lambda e: (-len(e["queries"]), -e["score"], e["rank"]))
+
+    def render_merged_digest(self, results: Sequence[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]],
+                             skipped: Sequence[str] = ()) -> str:
+        queries = [query for query, _, _ in results]
+        lines = [f"Search results for: {' | '.join(queries)}"]
+        if skipped:
+            lines.append(f"Not searched (limit of {self.max_queries} queries): {' | '.join(skipped)}")
+        for query, response, error in results:
+            if error is not None:
+                lines.append(f"Failed: {query} ({str(error)})")
+            elif (response or {}).get("answer"):
+                lines.append(f"Answer ({query}): {self._clip(response['answer'])}")
+        merged = self.merge_results(results)
+        for i, entry in enumerate(merged[: self.merged_top_k], 1):
+            found_by = f" [{len(entry['queries'])} queries]" if len(entry["queries"]) > 1 else ""
+            lines.append(f"{i}. {entry['title'] or 'Untitled'} - {entry['url']}{found_by}")
+            snippet = self._clip(entry["content"])
+            if snippet:
+                lines.append(f"   {snippet}")
+        if not merged:
+            lines.append("No results found.")
+
+        digest = "\n".join(lines)
+        if len(digest) > self.merged_max_chars:
+            digest = digest[: self.merged_max_chars - 3].rstrip() + "..."
+        return digest
+
+    def _fetch(self, query: str) -> Dict[str, Any]:
+        client = self.client
+        if client is None:
+            raise RuntimeError("Tavily client not initialized")
+        return client.search(query=query, max_results=self.top_k)
+
+    def render_digest(self, query: str, response: Dict[str, Any]) -> str:
+        lines = [f"Search results for: {query}"]
+        answer = response.get("answer")
+        if answer:
+            lines.append(f"Answer: {self._clip(answer)}")
+        for i, result in enumerate((response.get("results") or [])[: self.top_k], 1):
+            lines.append(f"{i}. {result.get('title') or 'Untitled'} - {result.get('url', '')}")
+            snippet = self._clip(result.get("content") or "")
+            if snippet:
+                lines.append(f"   {snippet}")
+        if len(lines) == 1:
+            lines.append("No results found.")
+
+        digest = "\n".join(lines)
+        if len(digest) > self.max_chars:
+            digest = digest[: self.max_chars - 3].rstrip() + "..."
+        return digest
+
+    def _clip(self, text: str) -> str:
+        text = re.sub(r"\s+", " ", str(text)).strip()
+        if len(text) <= self.snippet_chars:
+            return text
+        return text[: self.snippet_chars - 3].rsplit(" ", 1)[0] + "..."
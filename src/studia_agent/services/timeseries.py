@@ -0,0 +1,104 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from .token_snapshot import TokenSnapshot
+
+# Column name -> snapshot attribute. Every column is float64 with NaN for
+# missing values, so all files of a token always have the same row count.
+COLUMNS = {
+    "ts": None,
+    "price_usd": "price_usd",
+    "market_cap_usd": "market_cap_usd",
+    "liquidity_usd": "liquidity_usd",
+    "volume_usd": "volume_usd",
+    "risk_score": "risk_score",
+    "rugged": "rugged",
+    "txns": "txns",
+}
+DTYPE = np.dtype("<f8")
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class TimeSeriesStore:
+    """
+    Append-only, column-per-file history of token snapshots.
+
+    Each token has a directory holding one raw little-endian float64 file per
+    column. Appends write a row to every column; reads memory-map the files,
+    so loading a long history costs no copy until the data is touched.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("STUDIA_HISTORY_DIR", ".cache/history")
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def token_dir(self, address: str) -> str:
+        name = address if _SAFE_NAME.match(address) else hashlib.sha256(address.encode()).hexdigest()[:32]
+        return os.path.join(self.root, name)
+
+    def append(self, snapshot: TokenSnapshot, ts: Optional[float] = None):
+        self.append_many([snapshot], ts)
+
+    def append_many(self, snapshots: Iterable[TokenSnapshot], ts: Optional[float] = None):
+        """Append one row per snapshot, all stamped ``ts`` (default: now)."""
+        ts = time.time() if ts is None else ts
+        rows: Dict[str, List[List[float]]] = {}
+        for snapshot in snapshots:
+            row = [ts] + [
+                np.nan if getattr(snapshot, attr) is None else float(getattr(snapshot, attr))
+                for attr in list(COLUMNS.values())[1:]
+            ]
+            rows.setdefault(snapshot.address, []).append(row)
+
+        with self._lock:
+            for address, values in rows.items():
+                directory = self.token_dir(address)
+                os.makedirs(directory, exist_ok=True)
+                block = np.asarray(values, dtype=DTYPE)
+                length = self._length(directory)
+                for i, column in enumerate(COLUMNS):
+                    with open(os.path.join(directory, column), "r+b" if self._exists(directory, column) else "wb") as f:
+                        # Drop any torn tail left by an interrupted append.
+                        f.truncate(length * DTYPE.itemsize)
+                        f.seek(0, os.SEEK_END)
+                        f.write(np.ascontiguousarray(block[:, i]).tobytes())
+
+    def load(self, address: str, since: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Return read-only memory-mapped columns for ``address``, optionally only
+        the rows with ``ts >= since``. Missing tokens give empty arrays.
+        """
+        directory = self.token_dir(address)
+        length = self._length(directory)
+        if length == 0:
+            return {column: np.empty(0, dtype=DTYPE) for column in COLUMNS}
+        series = {
+            column: np.memmap(os.path.join(directory, column), dtype=DTYPE, mode="r", shape=(length,))
+            for column in COLUMNS
+        }
+        if since is not None:
+            start = int(np.searchsorted(series["ts"], since, side="left"))
+            series = {column: values[start:] for column, values in series.items()}
+        return series
+
+    def count(self, address: str) -> int:
+        return self._length(self.token_dir(address))
+
+    @staticmethod
+    def _exists(directory: str, column: str) -> bool:
+        return os.path.exists(os.path.join(directory, column))
+
+    @staticmethod
+    def _length(directory: str) -> int:
+        # Rows fully written to every column.
+        sizes = []
+        for column in COLUMNS:
+            path = os.path.join(directory, column)
+            sizes.append(os.path.getsize(path) if os.path.exists(path) else 0)
+        return min(sizes) // DTYPE.itemsize
@@ -1,44 +1,241 @@
 import os
-import requests
-from typing import Dict, Any, Optional
+import random
+import logging
+import asyncio
+import threading
+import concurrent.futures
+import httpx
+from typing import Dict, Any, Optional, Iterable, Iterator, AsyncIterator, Tuple
+from .cache import ResponseCache, MemoryCache, SQLiteCache, FRESH, STALE
+from .token_snapshot import TokenSnapshot
+from ..instrumentation import register_cache, span
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 
 class TokenService:
-    def __init__(self):
-        self.base_url = "https://data.solanatracker.io"
+    """Solana Tracker client backed by one pooled, keep-alive HTTP connection pool.
+
+    All requests run on a private event loop thread that owns the
+    ``httpx.AsyncClient``, so the sync API, the async API and the bulk API
+    share the same connections, concurrency limit and response cache.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        timeout: float = 10.0,
+        max_concurrency: int = 16,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+    ):
+        self.base_url = os.getenv("SOLANA_TRACKER_BASE_URL", "https://data.solanatracker.io")
         self.api_key = os.getenv("SOLANA_TRACKER_API_KEY")
-        
+        self.cache = cache if cache is not None else self._default_cache()
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._start_lock = threading.Lock()
+        register_cache("token", self.cache.stats)
+
+    @staticmethod
+    def _default_cache() -> ResponseCache:
+        """Build the response cache, on disk if SOLANA_TRACKER_CACHE_DB is set."""
+        ttl = float(os.getenv("SOLANA_TRACKER_CACHE_TTL", "30"))
+        stale_ttl = float(os.getenv("SOLANA_TRACKER_CACHE_STALE_TTL", "120"))
+        db_path = os.getenv("SOLANA_TRACKER_CACHE_DB")
+        backend = SQLiteCache(db_path) if db_path else MemoryCache()
+        return ResponseCache(backend, ttl=ttl, stale_ttl=stale_ttl)
+
+    @staticmethod
+    def _normalize_address(token_address: str) -> str:
+        # Handle case where input might be a JSON string
+        if isinstance(token_address, str) and token_address.startswith('{'):
+            import json
+            data = json.loads(token_address)
+            token_address = data.get('token_address')
+        return str(token_address).strip().strip('"\'')
+
     def get_token_info(self, token_address: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve information for a specific token from the Solana Tracker API.
-        
+
+        Responses are served from ``self.cache`` when available, so agents
+        sharing this service fetch each token only once per TTL window.
+
         Args:
             token_address (str): The address of the token
-            
+
         Returns:
             dict: Token information including market data, pools, risks, etc.
         """
-        try:
-            # Handle case where input might be a JSON string
-            if isinstance(token_address, str) and token_address.startswith('{'):
-                import json
-                data = json.loads(token_address)
-                token_address = data.get('token_address')
-
-            headers = {
-                "x-api-key": self.api_key,
-                "Accept": "application/json"
-            }
-            
-            print(f"Fetching data for token: {token_address}")  # Debug print
-            response = requests.get(
-                f"{self.base_url}/tokens/{token_address}",
-                headers=headers
+        token_address = self._normalize_address(token_address)
+        return self._submit(self._get(token_address)).result()
+
+    def get_token_snapshot(self, token_address: str) -> Optional[TokenSnapshot]:
+        """Return the compact :class:`TokenSnapshot` projection of a token."""
+        token_address = self._normalize_address(token_address)
+        data = self.get_token_info(token_address)
+        return TokenSnapshot.from_payload(token_address, data) if data else None
+
+    async def aget_token_info(self, token_address: str) -> Optional[Dict[str, Any]]:
+        """Async variant of :meth:`get_token_info`, usable from any event loop."""
+        token_address = self._normalize_address(token_address)
+        return await asyncio.wrap_future(self._submit(self._get(token_address)))
+
+    def get_token_infos(self, addresses: Iterable[str], refresh: bool = False) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Fetch many tokens concurrently and yield ``(address, info)`` pairs as
+        each request finishes. At most ``max_concurrency`` requests are in
+        flight; failed lookups yield ``None`` instead of stopping the batch.
+        With ``refresh``, cached entries are bypassed (and then updated) so
+        pollers always see current data.
+        """
+        futures = [self._submit(self._get_pair(address, refresh)) for address in self._unique(addresses)]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+    async def aget_token_infos(self, addresses: Iterable[str], refresh: bool = False) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Async generator counterpart of :meth:`get_token_infos`."""
+        futures = [
+            asyncio.wrap_future(self._submit(self._get_pair(address, refresh)))
+            for address in self._unique(addresses)
+        ]
+        for next_done in asyncio.as_completed(futures):
+            yield await next_done
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return hit/miss counters of the response cache."""
+        return self.cache.stats.as_dict()
+
+    def close(self):
+        """Close pooled connections and stop the background event loop."""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _unique(self, addresses: Iterable[str]):
+        seen = set()
+        for address in addresses:
+            address = self._normalize_address(address)
+            if address not in seen:
+                seen.add(address)
+                yield address
+
+    def _submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="token-service-loop", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily on the service loop so it is bound to that loop.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "x-api-key": self.api_key or "",
+                    "Accept": "application/json"
+                },
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=30.0,
+                ),
             )
-            response.raise_for_status()
-            data = response.json()
-            print(f"API Response: {data}")  # Debug print
-            return data
-            
-        except requests.RequestException as e:
-            print(f"Error fetching token info: {str(e)}")
-            return None 
\ No newline at end of file
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _get_pair(self, token_address: str, refresh: bool = False):
+        return token_address, await self._get(token_address, refresh)
+
+    async def _get(self, token_address: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        if not refresh:
+            value, state = self.cache.lookup(token_address)
+            if state == FRESH:
+                return value
+            if state == STALE:
+                if self.cache.begin_refresh(token_address):
+                    asyncio.get_running_loop().create_task(self._refresh(token_address))
+                return value
+        # Concurrent misses for the same token share one upstream request.
+        pending = self._inflight.get(token_address)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        pending = asyncio.get_running_loop().create_future()
+        self._inflight[token_address] = pending
+        try:
+            value = await self._fetch_token_info(token_address)
+            self.cache.store(token_address, value)
+            pending.set_result(value)
+        except BaseException as e:
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[token_address]
+        return value
+
+    async def _refresh(self, token_address: str):
+        try:
+            self.cache.store(token_address, await self._fetch_token_info(token_address))
+        finally:
+            self.cache.end_refresh(token_address)
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps concurrent workers from retrying in lockstep.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _fetch_token_info(self, token_address: str) -> Optional[Dict[str, Any]]:
+        client = self._get_client()
+        async with self._semaphore:
+            with span("http.fetch", route="/tokens/{address}", token=token_address) as fetch_span:
+                for attempt in range(self.max_retries + 1):
+                    response = None
+                    fetch_span.set(attempts=attempt + 1)
+                    try:
+                        logger.debug("Fetching data for token: %s", token_address)
+                        response = await client.get(f"/tokens/{token_address}")
+                        fetch_span.set(status=response.status_code)
+                        if response.status_code not in RETRY_STATUS_CODES:
+                            response.raise_for_status()
+                            return response.json()
+                        error = f"HTTP {response.status_code}"
+                    except httpx.TransportError as e:
+                        error = str(e)
+                    except (httpx.HTTPStatusError, ValueError) as e:
+                        logger.warning("Error fetching token info for %s: %s", token_address, e)
+                        return None
+
+                    if attempt == self.max_retries:
+                        logger.warning("Error fetching token info for %s: %s (gave up after %d attempts)",
+                                       token_address, error, attempt + 1)
+                        return None
+                    await asyncio.sleep(self._backoff(attempt, response))
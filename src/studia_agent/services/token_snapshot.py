@@ -0,0 +1,148 @@
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+SOCIAL_KEYS = ("twitter", "telegram", "website", "discord")
+MAX_RENDERED_RISKS = 8
+
+
+def _get(data: Any, *path, default=None):
+    for key in path:
+        if isinstance(data, dict):
+            data = data.get(key)
+        elif isinstance(data, list) and isinstance(key, int) and len(data) > key:
+            data = data[key]
+        else:
+            return default
+        if data is None:
+            return default
+    return data
+
+
+def _num(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fmt(value: Optional[float], suffix: str = "") -> str:
+    if value is None:
+        return "n/a"
+    return f"{value:.6g}{suffix}"
+
+
+def _fmt_pct(value: Optional[float]) -> str:
+    if value is None:
+        return "n/a"
+    return f"{value:+.2f}%"
+
+
+@dataclass(slots=True)
+class TokenSnapshot:
+    """The subset of a Solana Tracker token payload the analysis tasks use."""
+
+    address: str
+    name: Optional[str] = None
+    symbol: Optional[str] = None
+    decimals: Optional[int] = None
+    price_usd: Optional[float] = None
+    market_cap_usd: Optional[float] = None
+    liquidity_usd: Optional[float] = None
+    mint_authority: Optional[bool] = None
+    freeze_authority: Optional[bool] = None
+    change_1h: Optional[float] = None
+    change_24h: Optional[float] = None
+    buys: Optional[int] = None
+    sells: Optional[int] = None
+    txns: Optional[int] = None
+    volume_usd: Optional[float] = None
+    risk_score: Optional[float] = None
+    risks: Tuple[Tuple[str, str], ...] = ()
+    rugged: Optional[bool] = None
+    socials: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_payload(cls, address: str, payload: Dict[str, Any]) -> "TokenSnapshot":
+        """Project a raw ``/tokens/{address}`` response onto a snapshot."""
+        token = payload.get("token") or {}
+        pool = _get(payload, "pools", 0, default={})
+        security = pool.get("security") or {}
+        extensions = token.get("extensions") or {}
+        risk = payload.get("risk") or {}
+
+        decimals = token.get("decimals")
+        return cls(
+            address=address,
+            name=token.get("name"),
+            symbol=token.get("symbol"),
+            decimals=int(decimals) if decimals is not None else None,
+            price_usd=_num(_get(pool, "price", "usd")),
+            market_cap_usd=_num(_get(pool, "marketCap", "usd")),
+            liquidity_usd=_num(_get(pool, "liquidity", "usd")),
+            mint_authority=bool(security["mintAuthority"]) if "mintAuthority" in security else None,
+            freeze_authority=bool(security["freezeAuthority"]) if "freezeAuthority" in security else None,
+            change_1h=_num(_get(payload, "events", "1h", "priceChangePercentage")),
+            change_24h=_num(_get(payload, "events", "24h", "priceChangePercentage")),
+            buys=payload.get("buys"),
+            sells=payload.get("sells"),
+            txns=payload.get("txns"),
+            volume_usd=_num(_get(pool, "txns", "volume")),
+            risk_score=_num(risk.get("score")),
+            risks=tuple(
+                (str(item.get("name", "?")), str(item.get("level", "?")))
+                for item in risk.get("risks") or []
+                if isinstance(item, dict)
+            ),
+            rugged=risk.get("rugged"),
+            socials=tuple(
+                key for key in SOCIAL_KEYS if token.get(key) or extensions.get(key)
+            ),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TokenSnapshot":
+        """Inverse of :meth:`to_dict`, e.g. for snapshots read back from JSON."""
+        data = dict(data)
+        data["risks"] = tuple(tuple(risk) for risk in data.get("risks", ()))
+        data["socials"] = tuple(data.get("socials", ()))
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def digest(self) -> str:
+        """Key facts rounded to two significant digits, for change detection."""
+
+        def rounded(value: Optional[float]) -> str:
+            return "n/a" if value is None else f"{value:.2g}"
+
+        return " ".join([
+            f"token {self.symbol or self.address}",
+            f"price {rounded(self.price_usd)}",
+            f"market_cap {rounded(self.market_cap_usd)}",
+            f"liquidity {rounded(self.liquidity_usd)}",
+            f"change_24h {rounded(self.change_24h)}",
+            f"risk {rounded(self.risk_score)}",
+            f"rugged {'yes' if self.rugged else 'no'}",
+            f"mint {'yes' if self.mint_authority else 'no'}",
+            f"freeze {'yes' if self.freeze_authority else 'no'}",
+        ])
+
+    def render(self) -> str:
+        """Render the snapshot as a compact, fixed-layout block for prompts."""
+
+        def flag(value: Optional[bool], on: str, off: str) -> str:
+            return "n/a" if value is None else (on if value else off)
+
+        risks = "; ".join(f"{name}({level})" for name, level in self.risks[:MAX_RENDERED_RISKS])
+        if len(self.risks) > MAX_RENDERED_RISKS:
+            risks += f"; +{len(self.risks) - MAX_RENDERED_RISKS} more"
+        return "\n".join([
+            f"token: {self.name or 'n/a'} ({self.symbol or 'n/a'}) address={self.address} decimals={self.decimals if self.decimals is not None else 'n/a'}",
+            f"market: price_usd={_fmt(self.price_usd)} market_cap_usd={_fmt(self.market_cap_usd)} liquidity_usd={_fmt(self.liquidity_usd)}",
+            f"change: 1h={_fmt_pct(self.change_1h)} 24h={_fmt_pct(self.change_24h)}",
+            f"activity: txns={self.txns if self.txns is not None else 'n/a'} buys={self.buys if self.buys is not None else 'n/a'} sells={self.sells if self.sells is not None else 'n/a'} volume_usd={_fmt(self.volume_usd)}",
+            f"security: mint_authority={flag(self.mint_authority, 'enabled', 'disabled')} freeze_authority={flag(self.freeze_authority, 'enabled', 'disabled')}",
+            f"risk: score={_fmt(self.risk_score)} rugged={flag(self.rugged, 'yes', 'no')} risks={risks or 'none'}",
+            f"socials: {', '.join(self.socials) or 'none'}",
+        ])
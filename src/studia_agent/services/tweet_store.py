@@ -0,0 +1,93 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+class TweetStore:
+    """Append-only SQLite store of tweets collected per search query."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS tweets (
+                query TEXT NOT NULL,
+                id TEXT NOT NULL,
+                id_num INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (query, id)
+            )"""
+        )
+        # Progress of the newest-first backfill per query: ``watermark`` is
+        # the newest id of the last complete pass; a pass in progress has
+        # covered everything from ``pass_newest`` down to ``oldest``.
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS backfill_state (
+                query TEXT PRIMARY KEY,
+                watermark TEXT,
+                pass_newest TEXT,
+                oldest TEXT
+            )"""
+        )
+        self._conn.commit()
+
+    def backfill_state(self, query: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, pass_newest, oldest FROM backfill_state WHERE query = ?", (query,)
+            ).fetchone()
+        return dict(zip(("watermark", "pass_newest", "oldest"), row or (None, None, None)))
+
+    def save_backfill_state(self, query: str, watermark: Optional[str], pass_newest: Optional[str] = None,
+                            oldest: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backfill_state (query, watermark, pass_newest, oldest) VALUES (?, ?, ?, ?)",
+                (query, watermark, pass_newest, oldest),
+            )
+            self._conn.commit()
+
+    def add_many(self, query: str, records: Iterable[Any]) -> int:
+        """Store records (objects with ``to_dict()`` or dicts); returns how many were new."""
+        now = time.time()
+        rows = []
+        for record in records:
+            data = record.to_dict() if hasattr(record, "to_dict") else dict(record)
+            rows.append((query, data["id"], int(data["id"]), json.dumps(data, separators=(",", ":")), now))
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tweets (query, id, id_num, record, stored_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def newest_id(self, query: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM tweets WHERE query = ? ORDER BY id_num DESC LIMIT 1", (query,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def count(self, query: Optional[str] = None) -> int:
+        with self._lock:
+            if query is None:
+                return self._conn.execute("SELECT COUNT(*) FROM tweets").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM tweets WHERE query = ?", (query,)).fetchone()[0]
+
+    def iter_records(self, query: str) -> Iterator[Dict[str, Any]]:
+        """Iterate stored records for ``query`` oldest first without loading them all."""
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT record FROM tweets WHERE query = ? ORDER BY id_num", (query,))
+        for (record,) in cursor:
+            yield json.loads(record)
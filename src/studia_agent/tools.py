@@ -1,21 +1,85 @@
 import tweepy
-from typing import Optional
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional
+from .tweet_text import TweetRules, prepare_tweet
+from .services.tweet_store import TweetStore
+from .services.dedup_index import DuplicateIndex
+
+TWEET_FIELDS = ["created_at", "public_metrics", "lang", "author_id", "conversation_id"]
+USER_FIELDS = ["username", "name", "public_metrics", "verified"]
+
+@dataclass(slots=True)
+class TweetRecord:
+    """Compact view of a tweet and its author from a v2 search response."""
+
+    id: str
+    text: str
+    author_id: Optional[str] = None
+    username: Optional[str] = None
+    name: Optional[str] = None
+    followers: Optional[int] = None
+    created_at: Optional[str] = None
+    lang: Optional[str] = None
+    likes: int = 0
+    retweets: int = 0
+    replies: int = 0
+
+    @classmethod
+    def from_tweet(cls, tweet, user=None) -> "TweetRecord":
+        metrics = tweet.public_metrics or {}
+        user_metrics = (user.public_metrics or {}) if user is not None else {}
+        return cls(
+            id=str(tweet.id),
+            text=tweet.text,
+            author_id=str(tweet.author_id) if tweet.author_id else None,
+            username=user.username if user is not None else None,
+            name=user.name if user is not None else None,
+            followers=user_metrics.get("followers_count"),
+            created_at=tweet.created_at.isoformat() if tweet.created_at else None,
+            lang=tweet.lang,
+            likes=metrics.get("like_count", 0),
+            retweets=metrics.get("retweet_count", 0),
+            replies=metrics.get("reply_count", 0),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
 class TwitterTools:
-    def __init__(self, twitter_client=None):
+    def __init__(self, twitter_client=None, rules: Optional[TweetRules] = None, outbox=None,
+                 dedup: Optional[DuplicateIndex] = None, run_id: Optional[str] = None,
+                 token_address: str = ""):
         self.twitter_client = twitter_client
+        self.rules = rules or TweetRules()
+        # When set, tweets are queued for the OutboxPublisher instead of posted inline
+        self.outbox = outbox
+        # When set, near-duplicates of recent tweets about the same token are skipped
+        self.dedup = dedup
+        self.token_address = token_address
+        # Scopes outbox keys, so only a rerun of the same run is deduplicated there
+        self.run_id = run_id
 
 
     def post_tweet(self, content: str) -> str:
-        # Clean up the content first
-        content = content.strip()
+        # Clean up the content first (quotes, hashtags, extra emoji)
+        check = prepare_tweet(content, self.rules)
+        content = check.text
         
-        # Remove any quotes
-        content = content.replace('"', '').replace("'", "")
+        # Check Twitter's weighted character limit (URLs 23, CJK/emoji 2)
+        if not check.ok:
+            return f"Error: Tweet is invalid ({'; '.join(check.problems)}). Please rewrite to be more concise."
+
+        if self.dedup is not None:
+            match = self.dedup.find(content, "tweet", self.token_address)
+            if match is not None:
+                return f"Skipped: near-duplicate ({match.similarity:.0%} similar) of an earlier tweet: {match.text}"
         
-        # Check character limit (280 chars)
-        if len(content) > 280:
-            return f"Error: Tweet exceeds 280 characters (length: {len(content)}). Please rewrite to be more concise."
+        if self.outbox is not None:
+            key, queued = self.outbox.enqueue(content, scope=self.run_id)
+            if not queued:
+                return f"Tweet already queued or posted. Outbox ID: {key}"
+            self._remember(content)
+            return f"Tweet queued for publishing. Outbox ID: {key}"
         
         if self.twitter_client is None:
             return f"[PREVIEW - No Twitter credentials] Tweet content: {content}"
@@ -24,10 +88,15 @@ class TwitterTools:
             # Post tweet using v2 API
             response = self.twitter_client.create_tweet(text=content)
             tweet_id = response.data['id']
+            self._remember(content)
             return f"Tweet posted successfully! Tweet ID: {tweet_id}"
         except Exception as e:
             return f"Error posting tweet: {str(e)}" 
 
+    def _remember(self, content: str):
+        if self.dedup is not None:
+            self.dedup.add(content, "tweet", self.token_address)
+
     def search_twitter(self, query: str, limit: Optional[int] = 10) -> str:
         """
         Search Twitter for recent tweets matching the query
@@ -36,20 +105,91 @@ class TwitterTools:
             return f"[PREVIEW - No Twitter credentials] Would search Twitter for: {query}"
         
         try:
-            # Search tweets using v2 API
-            response = self.twitter_client.search_recent_tweets(
-                query=query,
-                max_results=min(limit, 100)  # API limit is 100
-            )
-            
-            if not response.data:
+            results = [
+                f"@{record.username or record.author_id}: {record.text}"
+                for record in self.iter_search_twitter(query, limit=limit)
+            ]
+            if not results:
                 return "No tweets found matching your query."
                 
-            results = []
-            for tweet in response.data:
-                results.append(f"@{tweet.author_id}: {tweet.text}")
-                
             return "\n\n".join(results)
             
         except Exception as e:
-            return f"Error searching tweets: {str(e)}"
\ No newline at end of file
+            return f"Error searching tweets: {str(e)}"
+
+    def iter_search_pages(self, query: str, page_size: int = 100, since_id: Optional[str] = None,
+                          max_pages: Optional[int] = None,
+                          until_id: Optional[str] = None) -> Iterator[List[TweetRecord]]:
+        """
+        Yield pages of recent tweets matching ``query``, following ``next_token``.
+
+        Author details are requested as expansions in the same call, so each
+        page costs exactly one API request and needs no user lookups.
+        """
+        next_token = None
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            response = self.twitter_client.search_recent_tweets(
+                query=query,
+                max_results=max(10, min(page_size, 100)),  # API allows 10-100
+                next_token=next_token,
+                since_id=since_id,
+                until_id=until_id,
+                expansions=["author_id"],
+                tweet_fields=TWEET_FIELDS,
+                user_fields=USER_FIELDS,
+            )
+            pages += 1
+            users = {user.id: user for user in (response.includes or {}).get("users", [])}
+            yield [TweetRecord.from_tweet(tweet, users.get(tweet.author_id)) for tweet in response.data or []]
+
+            next_token = (response.meta or {}).get("next_token")
+            if not next_token:
+                return
+
+    def iter_search_twitter(self, query: str, limit: Optional[int] = None, page_size: int = 100,
+                            since_id: Optional[str] = None) -> Iterator[TweetRecord]:
+        """Stream compact TweetRecords for ``query`` across pages, up to ``limit``."""
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        if limit is not None:
+            page_size = min(page_size, max(limit, 10))
+        for page in self.iter_search_pages(query, page_size=page_size, since_id=since_id):
+            for record in page:
+                yield record
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def backfill_twitter(self, query: str, store: TweetStore, max_pages: Optional[int] = None,
+                         resume: bool = True) -> int:
+        """
+        Write search results page by page into ``store`` and return how many
+        new tweets were stored.
+
+        Results come newest first, so a pass is only complete once the last
+        page is reached. With ``resume``, an interrupted pass (e.g. by
+        ``max_pages``) continues below the oldest tweet it fetched, and a new
+        pass only fetches tweets newer than the last complete one.
+        """
+        state = store.backfill_state(query) if resume else {"watermark": None, "pass_newest": None, "oldest": None}
+        watermark, pass_newest, oldest = state["watermark"], state["pass_newest"], state["oldest"]
+        stored = 0
+        pages = 0
+        complete = True
+        for page in self.iter_search_pages(query, since_id=watermark, until_id=oldest):
+            stored += store.add_many(query, page)
+            pages += 1
+            if page:
+                ids = [int(record.id) for record in page]
+                if pass_newest is None:
+                    pass_newest = str(max(ids))
+                oldest = str(min(ids)) if oldest is None else str(min(min(ids), int(oldest)))
+                store.save_backfill_state(query, watermark, pass_newest, oldest)
+            if max_pages is not None and pages >= max_pages:
+                complete = False
+                break
+        if complete:
+            store.save_backfill_state(query, pass_newest or watermark)
+        return stored
@@ -0,0 +1,147 @@
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List
+
+# Weighted length rules from twitter-text v3: code points in these ranges
+# weigh 1, everything else 2, every URL 23 and every emoji sequence 2.
+MAX_WEIGHTED_LENGTH = 280
+URL_WEIGHT = 23
+EMOJI_WEIGHT = 2
+_LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+
+_EMOJI_BASE = "[\U0001F000-\U0001FAFF\u2300-\u23ff\u2600-\u27bf\u2b00-\u2bff]"
+_EMOJI_MODS = "[\ufe0f\U0001F3FB-\U0001F3FF]*"
+EMOJI_RE = re.compile(
+    "(?:[\U0001F1E6-\U0001F1FF]{2}"  # flags
+    "|[0-9#*]\ufe0f?\u20e3"  # keycaps
+    f"|{_EMOJI_BASE}{_EMOJI_MODS}(?:\u200d{_EMOJI_BASE}{_EMOJI_MODS})*)"
+)
+URL_RE = re.compile(
+    r"(?:https?://|www\.)\S+"
+    r"|\b[a-z0-9-]+(?:\.[a-z0-9-]+)*\.(?:com|io|org|net|xyz|ai|app|fi|finance|co|gg|fun|dev|so|me|info|tech)\b(?:/\S*)?",
+    re.IGNORECASE,
+)
+HASHTAG_RE = re.compile(r"(?<![\w&])[#＃](?=\w*[^\W\d_])(\w+)")
+_ENTITY_RE = re.compile(f"(?P<url>{URL_RE.pattern})|(?P<emoji>{EMOJI_RE.pattern})", re.IGNORECASE)
+_QUOTE_PAIRS = {'"': '"', "'": "'", "“": "”", "‘": "’"}
+
+
+@dataclass
+class TweetRules:
+    """Mechanical rules every published tweet must satisfy."""
+
+    max_length: int = MAX_WEIGHTED_LENGTH
+    prefix: str = field(default_factory=lambda: os.getenv("TWEET_PREFIX", ""))
+    max_emoji: int = 1
+    allow_hashtags: bool = False
+
+
+@dataclass
+class TweetCheck:
+    text: str
+    weighted_length: int
+    problems: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def _char_weight(char: str) -> int:
+    code = ord(char)
+    for start, end in _LIGHT_RANGES:
+        if start <= code <= end:
+            return 1
+    return 2
+
+
+def weighted_length(text: str) -> int:
+    """Length of ``text`` as counted by Twitter (URLs 23, CJK/emoji 2)."""
+    text = unicodedata.normalize("NFC", text)
+    total, pos = 0, 0
+    for match in _ENTITY_RE.finditer(text):
+        total += sum(_char_weight(c) for c in text[pos:match.start()])
+        total += URL_WEIGHT if match.group("url") else EMOJI_WEIGHT
+        pos = match.end()
+    return total + sum(_char_weight(c) for c in text[pos:])
+
+
+def _strip_wrapping_quotes(text: str) -> str:
+    while len(text) >= 2 and _QUOTE_PAIRS.get(text[0]) == text[-1]:
+        text = text[1:-1].strip()
+    return text
+
+
+def normalize_tweet(text: str, rules: TweetRules = None) -> str:
+    """
+    Deterministically fix the mechanical issues in a draft tweet: wrapping
+    quotes, stray double quotes, hashtags, extra emoji, duplicate prefixes and
+    runs of whitespace. Length is not changed beyond that.
+    """
+    rules = rules or TweetRules()
+    text = _strip_wrapping_quotes(unicodedata.normalize("NFC", str(text)).strip())
+    text = text.replace('"', "").replace("“", "").replace("”", "")
+
+    if not rules.allow_hashtags:
+        text = HASHTAG_RE.sub(r"\1", text)
+
+    seen = 0
+
+    def limit_emoji(match):
+        nonlocal seen
+        seen += 1
+        return match.group(0) if seen <= rules.max_emoji else ""
+
+    text = EMOJI_RE.sub(limit_emoji, text)
+    text = "\n".join(re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines())
+    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+
+    if rules.prefix:
+        while text.startswith(rules.prefix):
+            text = text[len(rules.prefix):].lstrip()
+        text = f"{rules.prefix}{text}"
+    else:
+        # Writers are still prompted for a ' prefix; without one configured it is a stray quote
+        while text.startswith("'"):
+            text = text[1:].lstrip()
+    return text
+
+
+def validate_tweet(text: str, rules: TweetRules = None) -> TweetCheck:
+    """Check ``text`` against ``rules`` without modifying it."""
+    rules = rules or TweetRules()
+    problems = []
+    length = weighted_length(text)
+    if not text.strip():
+        problems.append("tweet is empty")
+    if length > rules.max_length:
+        problems.append(f"weighted length {length} exceeds {rules.max_length}")
+    if _strip_wrapping_quotes(text) != text:
+        problems.append("tweet is wrapped in quotes")
+    if not rules.allow_hashtags and HASHTAG_RE.search(text):
+        problems.append("tweet contains hashtags")
+    emoji_count = len(EMOJI_RE.findall(text))
+    if emoji_count > rules.max_emoji:
+        problems.append(f"tweet has {emoji_count} emoji (max {rules.max_emoji})")
+    if rules.prefix and (not text.startswith(rules.prefix) or text[len(rules.prefix):].lstrip().startswith(rules.prefix)):
+        problems.append(f"tweet must start with exactly one {rules.prefix!r} prefix")
+    return TweetCheck(text, length, problems)
+
+
+def prepare_tweet(text: str, rules: TweetRules = None) -> TweetCheck:
+    """Normalize ``text`` and validate the result."""
+    rules = rules or TweetRules()
+    return validate_tweet(normalize_tweet(text, rules), rules)
+
+
+def truncate_tweet(text: str, rules: TweetRules = None) -> str:
+    """Cut ``text`` at a word boundary so it fits ``rules.max_length``."""
+    rules = rules or TweetRules()
+    if weighted_length(text) <= rules.max_length:
+        return text
+    words = text.split(" ")
+    while words and weighted_length(" ".join(words) + "…") > rules.max_length:
+        words.pop()
+    return " ".join(words).rstrip(",;:-") + "…"
@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .services.token_service import TokenService
+from .services.token_snapshot import TokenSnapshot
+from .services.timeseries import TimeSeriesStore
+from .instrumentation import metrics, span
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+MISSING = "missing"
+
+
+@dataclass
+class Thresholds:
+    """Minimum moves that count as significant. Percentages are relative to the baseline."""
+
+    price_pct: float = 10.0
+    liquidity_pct: float = 20.0
+    market_cap_pct: float = 15.0
+    risk_score: float = 1.0
+    trigger_on_new: bool = True
+
+    @classmethod
+    def from_env(cls) -> "Thresholds":
+        return cls(
+            price_pct=float(os.getenv("WATCH_PRICE_PCT", cls.price_pct)),
+            liquidity_pct=float(os.getenv("WATCH_LIQUIDITY_PCT", cls.liquidity_pct)),
+            market_cap_pct=float(os.getenv("WATCH_MARKET_CAP_PCT", cls.market_cap_pct)),
+            risk_score=float(os.getenv("WATCH_RISK_SCORE", cls.risk_score)),
+        )
+
+
+@dataclass
+class ChangeEvent:
+    """Result of comparing one polled snapshot with its baseline."""
+
+    address: str
+    kind: str
+    snapshot: Optional[TokenSnapshot] = None
+    baseline: Optional[TokenSnapshot] = None
+    # field -> (baseline value, current value)
+    changes: Dict[str, Tuple[object, object]] = field(default_factory=dict)
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def significant(self) -> bool:
+        return bool(self.reasons)
+
+    def describe(self) -> str:
+        return f"{self.address} {self.kind}: " + ("; ".join(self.reasons) or "no significant change")
+
+
+def _pct_change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / abs(old) * 100
+
+
+def diff_snapshots(baseline: TokenSnapshot, current: TokenSnapshot,
+                   thresholds: Thresholds) -> Tuple[Dict[str, Tuple[object, object]], List[str]]:
+    """Return the changed watched fields and the reasons that cross ``thresholds``."""
+    changes, reasons = {}, []
+    # Liquidity or market cap appearing from nothing (0 or unknown) has no
+    # percentage change but always counts as crossing the threshold.
+    for name, limit, from_nothing in (
+        ("price_usd", thresholds.price_pct, False),
+        ("liquidity_usd", thresholds.liquidity_pct, True),
+        ("market_cap_usd", thresholds.market_cap_pct, True),
+    ):
+        old, new = getattr(baseline, name), getattr(current, name)
+        if old == new:
+            continue
+        changes[name] = (old, new)
+        pct = _pct_change(old, new)
+        if pct is not None and abs(pct) >= limit:
+            reasons.append(f"{name} {pct:+.1f}%")
+        elif from_nothing and not old and new is not None and new > 0:
+            reasons.append(f"{name} {old or 0:,.0f} -> {new:,.0f}")
+
+    if baseline.risk_score != current.risk_score:
+        changes["risk_score"] = (baseline.risk_score, current.risk_score)
+        if baseline.risk_score is not None and current.risk_score is not None \
+                and abs(current.risk_score - baseline.risk_score) >= thresholds.risk_score:
+            reasons.append(f"risk_score {baseline.risk_score:g} -> {current.risk_score:g}")
+
+    if bool(baseline.rugged) != bool(current.rugged):
+        changes["rugged"] = (baseline.rugged, current.rugged)
+        reasons.append("rugged" if current.rugged else "no longer flagged as rugged")
+    return changes, reasons
+
+
+class WatchlistMonitor:
+    """
+    Polls a set of tokens and reports which ones moved enough to analyze.
+
+    Each poll is one bulk TokenService fetch with no LLM involvement. A token
+    is compared with its baseline, the snapshot taken when it last triggered
+    successfully, so slow drifts add up until they cross a threshold and a
+    failed ``on_trigger`` is retried on the next poll. Only significant
+    events are passed to ``on_trigger``, which is where crews are started.
+    Baselines can be kept in a JSON file so a restart does not re-trigger
+    every token, and with ``history`` every polled snapshot is recorded.
+    """
+
+    def __init__(
+        self,
+        token_service: TokenService,
+        addresses: Iterable[str] = (),
+        thresholds: Optional[Thresholds] = None,
+        on_trigger: Optional[Callable[[ChangeEvent], None]] = None,
+        on_event: Optional[Callable[[ChangeEvent], None]] = None,
+        state_path: Optional[str] = None,
+        history: Optional[TimeSeriesStore] = None,
+    ):
+        self.token_service = token_service
+        self.addresses: List[str] = list(dict.fromkeys(addresses))
+        self.thresholds = thresholds or Thresholds()
+        self.on_trigger = on_trigger
+        self.on_event = on_event
+        self.state_path = state_path
+        self.history = history
+        self.baselines: Dict[str, TokenSnapshot] = self._load_state()
+        self._stop = threading.Event()
+
+    def add(self, address: str):
+        if address not in self.addresses:
+            self.addresses.append(address)
+
+    def remove(self, address: str):
+        if address in self.addresses:
+            self.addresses.remove(address)
+        self.baselines.pop(address, None)
+
+    def check(self, address: str, snapshot: Optional[TokenSnapshot]) -> ChangeEvent:
+        """Compare ``snapshot`` with the baseline of ``address`` without side effects."""
+        baseline = self.baselines.get(address)
+        if snapshot is None:
+            return ChangeEvent(address, MISSING, baseline=baseline)
+        if baseline is None:
+            reasons = ["first snapshot"] if self.thresholds.trigger_on_new else []
+            return ChangeEvent(address, NEW, snapshot, reasons=reasons)
+        changes, reasons = diff_snapshots(baseline, snapshot, self.thresholds)
+        return ChangeEvent(address, CHANGED if changes else UNCHANGED, snapshot, baseline, changes, reasons)
+
+    def poll(self) -> List[ChangeEvent]:
+        """Fetch every watched token once and return one event per token."""
+        events = []
+        with span("watch.poll", tokens=len(self.addresses)) as poll_span:
+            for address, data in self.token_service.get_token_infos(self.addresses, refresh=True):
+                snapshot = TokenSnapshot.from_payload(address, data) if data else None
+                event = self.check(address, snapshot)
+                # A token that never triggers keeps its first snapshot as baseline;
+                # a triggering change becomes the baseline once on_trigger handled it.
+                deferred = event.significant and self.on_trigger is not None
+                if not deferred and (event.significant or (event.kind == NEW and snapshot is not None)):
+                    self.baselines[address] = snapshot
+                events.append(event)
+            poll_span.set(triggered=sum(event.significant for event in events))
+        if self.history is not None:
+            self.history.append_many(event.snapshot for event in events if event.snapshot is not None)
+
+        metrics.incr("studia_watch_polls_total")
+        for event in events:
+            metrics.incr("studia_watch_events_total", kind=event.kind, significant=event.significant)
+            if self.on_event is not None:
+                self.on_event(event)
+
+        for event in events:
+            if event.significant and self.on_trigger is not None:
+                try:
+                    self.on_trigger(event)
+                except Exception as e:
+                    # Keep the old baseline so the change triggers again next poll
+                    print(f"Error handling change for {event.address}: {str(e)}")
+                else:
+                    self.baselines[event.address] = event.snapshot
+        self._save_state()
+        return events
+
+    def run(self, interval: float = 60.0, max_polls: Optional[int] = None):
+        """Poll every ``interval`` seconds until :meth:`stop` or ``max_polls``."""
+        polls = 0
+        while not self._stop.is_set() and (max_polls is None or polls < max_polls):
+            started = time.monotonic()
+            self.poll()
+            polls += 1
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def stop(self):
+        self._stop.set()
+
+    def _load_state(self) -> Dict[str, TokenSnapshot]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            raw = json.load(f)
+        return {address: TokenSnapshot.from_dict(values) for address, values in raw.items()}
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({address: snapshot.to_dict() for address, snapshot in self.baselines.items()}, f)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,39 @@
+import numpy as np
+from studia_agent.services.dedup_index import BITS, DuplicateIndex, hamming, simhash
+
+TWEET = "$BONK price $0.000021, market cap $1.4B, liquidity $12M. Volume is rising and risk stays low."
+
+
+def test_simhash_is_deterministic_and_ignores_case_and_urls():
+    assert simhash(TWEET) == simhash(TWEET.upper())
+    assert simhash("Read more https://a.example/x") == simhash("Read more https://b.example/y")
+    assert simhash("") == 0
+
+
+def test_hamming_counts_differing_bits():
+    fingerprints = np.array([0, 0b1011, (1 << 64) - 1], dtype=np.uint64)
+    assert hamming(fingerprints, 0).tolist() == [0, 3, BITS]
+
+
+def test_similar_texts_are_closer_than_unrelated_ones():
+    edited = TWEET.replace("rising", "climbing")
+    unrelated = "Weekly community call moved to Friday; new docs for the staking dashboard are live."
+    near = int(hamming(np.array([simhash(edited)], dtype=np.uint64), simhash(TWEET))[0])
+    far = int(hamming(np.array([simhash(unrelated)], dtype=np.uint64), simhash(TWEET))[0])
+    assert near < far
+
+
+def test_find_matches_within_kind_and_scope(tmp_path):
+    index = DuplicateIndex(str(tmp_path / "dedup.sqlite"), threshold=0.85)
+    index.add(TWEET, "tweet", "token-a")
+    match = index.find(TWEET, "tweet", "token-a")
+    assert match is not None and match.similarity == 1.0
+    assert index.find(TWEET, "tweet", "token-b") is None
+    assert index.find(TWEET, "digest", "token-a") is None
+
+
+def test_find_exact_needs_identical_text(tmp_path):
+    index = DuplicateIndex(str(tmp_path / "dedup.sqlite"))
+    index.add("price=0.00002|liquidity=12M", "digest", "token-a")
+    assert index.find_exact("price=0.00002|liquidity=12M", "digest", "token-a") is not None
+    assert index.find_exact("price=0.00003|liquidity=12M", "digest", "token-a") is None
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from studia_agent.services.indicators import HOUR, compute_indicators
+
+
+def series(price, liquidity=None, volume=None, risk=None, rugged=None):
+    n = len(price)
+    nan = [np.nan] * n
+    return {
+        "ts": np.arange(n, dtype=float) * HOUR,
+        "price_usd": np.array(price, dtype=float),
+        "liquidity_usd": np.array(liquidity if liquidity is not None else nan, dtype=float),
+        "volume_usd": np.array(volume if volume is not None else nan, dtype=float),
+        "risk_score": np.array(risk if risk is not None else nan, dtype=float),
+        "rugged": np.array(rugged if rugged is not None else [0] * n, dtype=float),
+    }
+
+
+def test_needs_two_snapshots():
+    assert compute_indicators(series([1.0])) is None
+
+
+def test_price_return_trend_and_drawdown():
+    result = compute_indicators(series([1.0, 2.0, 4.0]))
+    assert result.points == 3 and result.hours == pytest.approx(2.0)
+    assert result.return_pct == pytest.approx(300.0)
+    assert result.trend_pct_per_hour == pytest.approx(100.0)  # doubles every hour
+    assert result.volatility_pct == pytest.approx(0.0)
+    assert result.max_drawdown_pct == pytest.approx(0.0)
+
+    dipped = compute_indicators(series([1.0, 2.0, 1.0]))
+    assert dipped.max_drawdown_pct == pytest.approx(50.0)
+
+
+def test_vwap_weights_by_traded_volume():
+    # All volume traded while the price was 2.0
+    result = compute_indicators(series([1.0, 2.0, 3.0], volume=[100.0, 1100.0, 1100.0]))
+    assert result.vwap_usd == pytest.approx(2.0)
+    assert result.price_vs_vwap_pct == pytest.approx(50.0)
+    # Without volume growth every snapshot weighs the same
+    flat = compute_indicators(series([1.0, 2.0, 3.0], volume=[5.0, 5.0, 5.0]))
+    assert flat.vwap_usd == pytest.approx(2.0)
+
+
+def test_missing_prices_are_skipped():
+    result = compute_indicators(series([1.0, np.nan, 0.0, 2.0]))
+    assert result.return_pct == pytest.approx(100.0)
+
+
+def test_liquidity_and_risk_trajectory():
+    result = compute_indicators(series(
+        [1.0, 1.0, 1.0],
+        liquidity=[100.0, 200.0, 50.0],
+        risk=[2.0, np.nan, 5.0],
+        rugged=[0, 0, 1],
+    ))
+    assert result.liquidity_change_pct == pytest.approx(-50.0)
+    assert result.liquidity_drawdown_pct == pytest.approx(75.0)
+    assert (result.risk_first, result.risk_last, result.risk_max) == (2.0, 5.0, 5.0)
+    assert result.risk_trend_per_day == pytest.approx(36.0)  # 3 points over 2 hours
+    assert result.rugged_seen
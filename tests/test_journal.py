@@ -0,0 +1,74 @@
+import json
+import time
+from studia_agent.journal import ANALYSIS, DRAFT, POST, SNAPSHOT, RunJournal
+
+
+def test_new_triggers_start_new_runs(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.jsonl"))
+    first = journal.start("token")
+    first.record(SNAPSHOT, {"price_usd": 1.0})
+    second = journal.start("token")
+    assert second.run_id != first.run_id
+    assert second.last_stage is None
+
+
+def test_resume_continues_latest_unfinished_run(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.jsonl"))
+    run = journal.start("token")
+    run.record(SNAPSHOT, {"price_usd": 1.0})
+    run.record(ANALYSIS, {"text": "report"})
+
+    resumed = journal.start("token", resume=True)
+    assert resumed.run_id == run.run_id
+    assert resumed.last_stage == ANALYSIS
+    assert resumed.get(ANALYSIS) == {"text": "report"}
+    assert journal.start("other-token", resume=True).run_id != run.run_id
+
+
+def test_finished_runs_are_not_resumed(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.jsonl"))
+    run = journal.start("token")
+    run.record(DRAFT, {"raw": "draft", "text": "draft"})
+    run.record(POST, {"result": "Tweet posted"})
+
+    assert journal.start("token", resume=True).run_id != run.run_id
+    # Asked for explicitly, a finished run comes back with everything it recorded
+    loaded = journal.start("token", run_id=run.run_id)
+    assert loaded.finished
+    assert loaded.get(DRAFT) == {"raw": "draft", "text": "draft"}
+
+
+def test_errors_leave_the_run_open(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.jsonl"))
+    run = journal.start("token")
+    run.record(DRAFT, {"raw": "draft", "text": "draft"})
+    run.record("error", {"stage": POST, "error": "Error posting tweet"})
+
+    resumed = journal.start("token", resume=True)
+    assert resumed.run_id == run.run_id
+    assert not resumed.finished and resumed.last_stage == DRAFT
+
+
+def test_resume_ignores_stale_runs(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    entry = {"run": "old", "token": "token", "stage": SNAPSHOT, "ts": time.time() - 7200, "data": {}}
+    path.write_text(json.dumps(entry) + "\n")
+    journal = RunJournal(str(path))
+    assert journal.start("token", resume=True, max_age=3600).run_id != "old"
+    assert journal.start("token", resume=True, max_age=None).run_id == "old"
+
+
+def test_index_sees_other_writers_and_skips_torn_lines(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    reader = RunJournal(path)
+    assert reader.start("token", resume=True).last_stage is None
+
+    writer = RunJournal(path)
+    run = writer.start("token")
+    run.record(SNAPSHOT, {"price_usd": 1.0})
+    with open(path, "a") as f:
+        f.write('{"run": "torn", "tok')
+
+    resumed = reader.start("token", resume=True)
+    assert resumed.run_id == run.run_id
+    assert reader.load("torn") is None
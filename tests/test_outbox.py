@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+from studia_agent.outbox import PENDING, POSTED, OutboxPublisher, TweetOutbox
+
+
+class FakeTwitter:
+    """Records posts and lists them back as the account's tweets."""
+
+    def __init__(self):
+        self.posted = []
+
+    def request(self, method, path, json=None, user_auth=False):
+        self.posted.append(json["text"])
+        return SimpleNamespace(headers={}, json=lambda: {"data": {"id": str(len(self.posted))}})
+
+    def get_me(self, user_auth=False):
+        return SimpleNamespace(data=SimpleNamespace(id="me"))
+
+    def get_users_tweets(self, user_id, max_results=20, user_auth=False):
+        tweets = [SimpleNamespace(id=i + 1, text=text) for i, text in enumerate(self.posted)]
+        return SimpleNamespace(data=tweets)
+
+
+def test_enqueue_is_idempotent_per_scope(tmp_path):
+    outbox = TweetOutbox(str(tmp_path / "outbox.sqlite"))
+    key, queued = outbox.enqueue("Price up 5%", scope="run-1")
+    assert queued
+    assert outbox.enqueue("Price  up 5%", scope="run-1") == (key, False)
+    other, queued = outbox.enqueue("Price up 5%", scope="run-2")
+    assert queued and other != key
+    assert outbox.counts() == {PENDING: 2}
+
+
+def test_publishes_each_item_once(tmp_path):
+    outbox = TweetOutbox(str(tmp_path / "outbox.sqlite"))
+    twitter = FakeTwitter()
+    key, _ = outbox.enqueue("Price up 5%")
+    publisher = OutboxPublisher(outbox, twitter)
+    assert publisher.publish_pending() == 1
+    assert publisher.publish_pending() == 0
+    outbox.enqueue("Price up 5%")
+    assert publisher.publish_pending() == 0
+    assert twitter.posted == ["Price up 5%"]
+    assert outbox.status(key).status == POSTED
+
+
+def test_interrupted_send_is_verified_not_reposted(tmp_path):
+    outbox = TweetOutbox(str(tmp_path / "outbox.sqlite"))
+    twitter = FakeTwitter()
+    key, _ = outbox.enqueue("Price up 5%")
+    # The publisher crashed after the tweet went out but before recording it
+    outbox.claim_next()
+    twitter.posted.append("Price up 5%")
+    assert outbox.recover_interrupted() == 1
+
+    OutboxPublisher(outbox, twitter).publish_pending()
+    item = outbox.status(key)
+    assert item.status == POSTED and item.tweet_id == "1"
+    assert twitter.posted == ["Price up 5%"]
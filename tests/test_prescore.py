@@ -0,0 +1,53 @@
+import pytest
+from studia_agent.prescore import PreScorer, ScoringRules
+from studia_agent.services.token_snapshot import TokenSnapshot
+
+
+def snapshot(address, **fields):
+    defaults = {"liquidity_usd": 50_000.0, "market_cap_usd": 1_000_000.0, "risk_score": 2.0,
+                "mint_authority": False, "freeze_authority": False, "rugged": False}
+    return TokenSnapshot(address, **{**defaults, **fields})
+
+
+def test_higher_liquidity_ranks_first():
+    tokens = [snapshot("small", liquidity_usd=5_000.0), snapshot("large", liquidity_usd=5_000_000.0)]
+    ranked = PreScorer().score(tokens)
+    assert [token.address for token in ranked] == ["large", "small"]
+    assert ranked[0].score > ranked[1].score
+
+
+def test_rejected_tokens_rank_after_passing_ones():
+    tokens = [
+        snapshot("rugged", liquidity_usd=10_000_000.0, rugged=True),
+        snapshot("mintable", mint_authority=True),
+        snapshot("ok"),
+    ]
+    ranked = PreScorer().score(tokens)
+    assert ranked[0].address == "ok" and ranked[0].passed
+    assert {token.address: token.rejected_by for token in ranked[1:]} == {
+        "rugged": ("rugged",),
+        "mintable": ("mint_authority",),
+    }
+
+
+def test_missing_liquidity_fails_the_minimum():
+    (token,) = PreScorer().score([snapshot("unknown", liquidity_usd=None)])
+    assert not token.passed
+    assert token.rejected_by == ("liquidity",)
+
+
+def test_select_applies_top_n_and_min_score():
+    tokens = [snapshot(f"t{i}", liquidity_usd=10.0 ** (4 + i)) for i in range(4)]
+    scorer = PreScorer()
+    assert [token.address for token in scorer.select(tokens, top_n=2)] == ["t3", "t2"]
+    threshold = scorer.score(tokens)[1].score
+    assert [token.address for token in scorer.select(tokens, min_score=threshold)] == ["t3", "t2"]
+
+
+def test_rules_from_dict_rejects_unknown_names():
+    rules = ScoringRules.from_dict({"min_liquidity_usd": 10, "weights": {"liquidity_usd": 2.0}})
+    assert rules.min_liquidity_usd == 10 and rules.weights["liquidity_usd"] == 2.0
+    with pytest.raises(ValueError):
+        ScoringRules.from_dict({"min_liquidity": 10})
+    with pytest.raises(ValueError):
+        ScoringRules.from_dict({"weights": {"price": 1.0}})
@@ -0,0 +1,76 @@
+from studia_agent.tweet_text import (
+    TweetRules,
+    normalize_tweet,
+    prepare_tweet,
+    truncate_tweet,
+    validate_tweet,
+    weighted_length,
+)
+
+
+def test_weighted_length_counts_latin_as_one():
+    assert weighted_length("Solana is up 5%") == 15
+
+
+def test_weighted_length_counts_urls_as_23():
+    assert weighted_length("see https://example.com/a/very/long/path?x=1") == 4 + 23
+    assert weighted_length("see studia.ai") == 4 + 23
+
+
+def test_weighted_length_counts_cjk_and_emoji_as_two():
+    assert weighted_length("日本") == 4
+    assert weighted_length("🚀") == 2
+    # ZWJ sequences and skin tones are a single emoji
+    assert weighted_length("👨‍👩‍👧") == 2
+    assert weighted_length("👍🏽") == 2
+
+
+def test_normalize_strips_quotes_hashtags_and_extra_emoji():
+    rules = TweetRules(prefix="")
+    assert normalize_tweet('"$BONK is up 12% #Solana #memecoin 🚀🚀🔥"', rules) == "$BONK is up 12% Solana memecoin 🚀"
+
+
+def test_normalize_collapses_whitespace():
+    rules = TweetRules(prefix="")
+    assert normalize_tweet("Price   up\t5%\n\n\n\nLiquidity flat", rules) == "Price up 5%\n\nLiquidity flat"
+
+
+def test_normalize_keeps_exactly_one_prefix():
+    rules = TweetRules(prefix="'")
+    assert normalize_tweet("'' 'Price up 5%", rules) == "'Price up 5%"
+    assert normalize_tweet("Price up 5%", rules) == "'Price up 5%"
+
+
+def test_normalize_drops_stray_prefix_without_one_configured():
+    assert normalize_tweet("'Price up 5%", TweetRules(prefix="")) == "Price up 5%"
+
+
+def test_validate_reports_each_problem():
+    rules = TweetRules(prefix="")
+    assert validate_tweet("Price up 5%", rules).ok
+    problems = validate_tweet('"Up 5% #Solana 🚀🔥"', rules).problems
+    assert "tweet is wrapped in quotes" in problems
+    assert "tweet contains hashtags" in problems
+    assert "tweet has 2 emoji (max 1)" in problems
+    assert validate_tweet("  ", rules).problems == ["tweet is empty"]
+
+
+def test_validate_uses_weighted_length():
+    rules = TweetRules(prefix="")
+    assert validate_tweet("a" * 280, rules).ok
+    assert not validate_tweet("日" * 141, rules).ok
+
+
+def test_prepare_returns_normalized_text():
+    check = prepare_tweet('"Up 5% #Solana"', TweetRules(prefix=""))
+    assert check.ok
+    assert check.text == "Up 5% Solana"
+
+
+def test_truncate_cuts_at_a_word_boundary():
+    rules = TweetRules(prefix="")
+    text = " ".join(["liquidity"] * 60)
+    truncated = truncate_tweet(text, rules)
+    assert weighted_length(truncated) <= rules.max_length
+    assert truncated.endswith("liquidity…")
+    assert truncate_tweet("short", rules) == "short"